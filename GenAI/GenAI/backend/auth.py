@@ -1,3 +1,9 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -6,23 +12,103 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from database import get_db
+from cache import TTLCache
+from invalidation import bus
 import models
 
 SECRET_KEY = "brandcraft-secret-key-change-in-production-2024"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
 
+# bcrypt work factor, and the dedicated pool that bounds how many hashes run at once
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "32"))  # queued + running jobs
+HASH_RETRY_AFTER_SECONDS = 2
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
 
+# Verified token -> user id, and user id -> snapshot of the fields auth decisions need
+token_cache = TTLCache(maxsize=4096, ttl=300)
+user_cache = TTLCache(maxsize=4096, ttl=60)
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    id: int
+    username: str
+    email: str
+    role: str
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "UserSnapshot":
+        return cls(user.id, user.username, user.email, user.role, user.is_active, user.created_at)
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    """True if a stored bcrypt hash ($2b$<cost>$...) uses a lower cost than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed_password.split("$")[2]) < BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+class HashPool:
+    """Bounded bcrypt worker pool; rejects new work with 503 once HASH_QUEUE_LIMIT jobs are pending."""
+
+    def __init__(self, workers: int, queue_limit: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._lock = threading.Lock()
+        self.queue_limit = queue_limit
+        self.pending = 0
+
+    async def run(self, fn, *args):
+        """Run `fn` on the pool and await the result; no request or threadpool thread waits on it."""
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, please retry",
+                headers={"Retry-After": str(HASH_RETRY_AFTER_SECONDS)},
+            )
+        with self._lock:
+            self.pending += 1
+        future = self._executor.submit(fn, *args)
+        # Freed when the job finishes, even if the awaiting request is cancelled first
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+hash_pool = HashPool(HASH_POOL_WORKERS, HASH_QUEUE_LIMIT)
+
+
+async def hash_password_pooled(password: str) -> str:
+    return await hash_pool.run(hash_password, password)
+
+
+async def verify_password_pooled(plain_password: str, hashed_password: str) -> bool:
+    return await hash_pool.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -30,28 +116,50 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserSnapshot:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id_str: str = payload.get("sub")
-        if user_id_str is None:
+    user_id = token_cache.get(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            user_id_str: str = payload.get("sub")
+            if user_id_str is None:
+                raise credentials_exception
+            user_id = int(user_id_str)  # Convert string to int
+        except (JWTError, ValueError):
             raise credentials_exception
-        user_id = int(user_id_str)  # Convert string to int
-    except (JWTError, ValueError):
-        raise credentials_exception
+        # Never keep a token cached past its own expiry
+        token_cache.set(token, user_id, ttl=payload.get("exp", 0) - time.time())
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = user_cache.get(user_id)
     if user is None:
-        raise credentials_exception
+        db_user = db.query(models.User).filter(models.User.id == user_id).first()
+        if db_user is None:
+            raise credentials_exception
+        user = UserSnapshot.from_user(db_user)
+        user_cache.set(user_id, user)
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="Account suspended")
     return user
 
 
-def require_admin(current_user: models.User = Depends(get_current_user)):
+def invalidate_user(user_id: int):
+    """Drop a cached user snapshot so the next request reloads it from the database."""
+    user_cache.delete(user_id)
+
+
+bus.subscribe("user", lambda key: invalidate_user(int(key)))
+
+
+def auth_cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+
+def require_admin(current_user: UserSnapshot = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
@@ -0,0 +1,62 @@
+"""
+Compare two benchmark result files (from micro_bench.py, load_test.py or
+startup_bench.py --json) and flag regressions beyond a threshold. Exits 1
+when any tracked metric regressed, so it can gate CI.
+
+Usage: python benchmarks/compare.py baseline.json candidate.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+
+# metric -> True when higher is better
+TRACKED = {
+    "micro": {"median_us": False},
+    "load": {"rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False},
+    "startup": {"import_ms": False, "startup_ms": False, "total_ms": False},
+}
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list:
+    """Return (name, metric, before, after, change %, regressed) rows for metrics present in both files."""
+    if baseline["suite"] != candidate["suite"]:
+        raise SystemExit(f"cannot compare suite '{baseline['suite']}' with '{candidate['suite']}'")
+    rows = []
+    for name, before in baseline["results"].items():
+        after = candidate["results"].get(name)
+        if after is None:
+            continue
+        for metric, higher_is_better in TRACKED[baseline["suite"]].items():
+            if not before.get(metric) or after.get(metric) is None:
+                continue
+            change = (after[metric] - before[metric]) / before[metric] * 100
+            regressed = -change > threshold if higher_is_better else change > threshold
+            rows.append((name, metric, before[metric], after[metric], change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change counted as a regression")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    rows = compare(baseline, candidate, args.threshold)
+    print(f"{baseline['meta'].get('commit')} -> {candidate['meta'].get('commit')} ({baseline['suite']})")
+    for name, metric, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:40s} {metric:10s} {before:12.2f} -> {after:12.2f}  {change:+7.1f}%{flag}")
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"{regressions} regression(s) beyond {args.threshold:.0f}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
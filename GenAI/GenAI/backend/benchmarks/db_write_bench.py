@@ -0,0 +1,89 @@
+"""
+Concurrent write throughput benchmark for the BrandCraft database layer.
+Runs the same per-request insert+commit pattern the write routes use against
+a scratch SQLite file, first with default connection settings, then with the
+SQLITE_PRAGMAS tuning, then through the async session.
+
+Usage: python benchmarks/db_write_bench.py [--writers 16] [--rows 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy.orm import sessionmaker
+from database import Base, create_db_engine, create_async_db_engine
+import models
+
+
+def _write_rows(Session, rows: int):
+    for i in range(rows):
+        db = Session()
+        try:
+            db.add(models.ChatHistory(user_id=1, message=f"message {i}", response="response " * 50))
+            db.commit()
+        finally:
+            db.close()
+
+
+def bench_sync(url: str, writers: int, rows: int, tune_sqlite: bool) -> float:
+    engine = create_db_engine(url, tune_sqlite=tune_sqlite)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        for _ in range(writers):
+            pool.submit(_write_rows, Session, rows)
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return writers * rows / elapsed
+
+
+async def bench_async(url: str, writers: int, rows: int) -> float:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    engine = create_async_db_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine)
+
+    async def write_rows():
+        for i in range(rows):
+            async with Session() as db:
+                db.add(models.ChatHistory(user_id=1, message=f"message {i}", response="response " * 50))
+                await db.commit()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(write_rows() for _ in range(writers)))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return writers * rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=200, help="rows per writer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def url(name):
+            return f"sqlite:///{os.path.join(tmp, name)}"
+
+        before = bench_sync(url("default.db"), args.writers, args.rows, tune_sqlite=False)
+        after = bench_sync(url("tuned.db"), args.writers, args.rows, tune_sqlite=True)
+        async_after = asyncio.run(bench_async(url("async.db"), args.writers, args.rows))
+
+    print(f"{args.writers} writers x {args.rows} rows, one commit per row")
+    print(f"  sync, default settings : {before:10.0f} rows/s")
+    print(f"  sync, tuned pragmas    : {after:10.0f} rows/s  ({after / before:.1f}x)")
+    print(f"  async, tuned pragmas   : {async_after:10.0f} rows/s  ({async_after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Exercises the generation dispatcher against SimulatedLatencyBackend, a
+stand-in for a model server that answers after a fixed delay. Checks and
+reports the concurrency limit, coalescing of identical requests,
+micro-batching of sentiment requests and the timeout path.
+
+Usage: python benchmarks/dispatcher_bench.py [--latency 0.2] [--requests 40]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi import HTTPException
+from generation import Dispatcher, SimulatedLatencyBackend
+
+IDENTITY = {"brand_name": "Nova", "industry": "tech", "target_audience": "developers"}
+
+
+async def bench_concurrency(latency: float, requests: int):
+    backend = SimulatedLatencyBackend(latency=latency, max_concurrency=4)
+    dispatcher = Dispatcher(backend)
+    start = time.perf_counter()
+    await asyncio.gather(*(dispatcher.submit("brand_identity", **{**IDENTITY, "brand_name": f"Brand{i}"})
+                           for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    expected = latency * -(-requests // backend.max_concurrency)
+    print(f"concurrency: {requests} distinct requests, limit {backend.max_concurrency}: "
+          f"{elapsed:.2f}s (expected ~{expected:.2f}s)")
+    assert elapsed >= expected * 0.9
+
+
+async def bench_coalescing(latency: float, requests: int):
+    backend = SimulatedLatencyBackend(latency=latency)
+    dispatcher = Dispatcher(backend)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(dispatcher.submit("brand_identity", **IDENTITY) for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    print(f"coalescing:  {requests} identical requests -> {backend.calls} backend call(s), "
+          f"{dispatcher.stats()['shared']} coalesced, {elapsed:.2f}s")
+    assert backend.calls == 1 and all(r == results[0] for r in results)
+
+
+async def bench_batching(latency: float, requests: int):
+    backend = SimulatedLatencyBackend(latency=latency)
+    dispatcher = Dispatcher(backend)
+    start = time.perf_counter()
+    await asyncio.gather(*(dispatcher.submit("sentiment", text=f"great product number {i}")
+                           for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    print(f"batching:    {requests} sentiment requests -> {backend.batches} backend batch(es), {elapsed:.2f}s")
+    assert backend.batches < requests
+
+
+async def bench_timeout(latency: float):
+    backend = SimulatedLatencyBackend(latency=latency, timeout=latency / 4)
+    dispatcher = Dispatcher(backend)
+    try:
+        await dispatcher.submit("brand_identity", **IDENTITY)
+    except HTTPException as e:
+        print(f"timeout:     backend slower than {backend.timeout:.2f}s -> HTTP {e.status_code}")
+        assert e.status_code == 504
+    else:
+        raise AssertionError("expected a timeout")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated backend latency in seconds")
+    parser.add_argument("--requests", type=int, default=40)
+    args = parser.parse_args()
+
+    await bench_concurrency(args.latency, args.requests)
+    await bench_coalescing(args.latency, args.requests)
+    await bench_batching(args.latency, args.requests)
+    await bench_timeout(args.latency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
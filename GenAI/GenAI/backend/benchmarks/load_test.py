@@ -0,0 +1,164 @@
+"""
+In-process load harness for the BrandCraft API.
+Drives the full FastAPI app through httpx's ASGI transport (no network, so it
+measures the app itself) with a weighted mix of realistic operations, at a
+configurable number of concurrent virtual users, against a scratch SQLite
+file. Reports RPS and p50/p95/p99 per operation and overall.
+
+Usage: python benchmarks/load_test.py [--users 16] [--duration 10] [--mix login=5,content=20,...]
+                                      [--bcrypt-rounds 4] [--no-cache] [--rate-limit] [--json out.json]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from results import percentile, write_results
+
+DEFAULT_MIX = {"login": 5, "brand_names": 10, "content": 20, "chat": 20, "sentiment": 20, "brand_kit": 25}
+BRANDS = [f"Brand{i}" for i in range(50)]
+TONES = ["professional", "playful", "modern", "bold"]
+MESSAGES = ["Help me with a SWOT analysis", "How should I position my brand?", "Plan a launch campaign",
+            "What colors suit a fintech brand?", "Write me a tagline"]
+REVIEWS = ["Great product, love it", "Terrible support and slow shipping", "It is okay, nothing special",
+           "Amazing quality but expensive", "Poor packaging, excellent taste"]
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"unknown operation '{name}', choose from {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class VirtualUser:
+    def __init__(self, client, index: int, headers: dict):
+        self.client = client
+        self.email = f"load{index}@example.com"
+        self.headers = headers
+        self.auth = {}
+        self.project_id = None
+        self.rng = random.Random(index)
+
+    async def setup(self):
+        await self.client.post("/api/register", json={"username": self.email, "email": self.email, "password": "pw"})
+        await self.login()
+        project = await self.client.post("/api/projects", json={"name": "Load", "description": "load test"},
+                                         headers=self.auth)
+        self.project_id = project.json()["id"]
+        for i in range(20):
+            await self.client.post("/api/brand-kit", json={"project_id": self.project_id, "asset_type": "color",
+                                                           "asset_value": f"#{i:06x}"}, headers=self.auth)
+
+    async def login(self):
+        response = await self.client.post("/api/login", json={"email": self.email, "password": "pw"})
+        self.auth = {**self.headers, "Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def run(self, op: str):
+        rng, post = self.rng, self.client.post
+        if op == "login":
+            return await self.login()
+        if op == "brand_names":
+            return await post("/api/brand-names", headers=self.auth, json={
+                "industry": "technology", "keywords": rng.choice(BRANDS), "target_audience": "developers",
+                "tone": rng.choice(TONES)})
+        if op == "content":
+            return await post("/api/content-generate", headers=self.auth, json={
+                "brand_name": rng.choice(BRANDS), "content_type": rng.choice(["blog", "social_post", "ad_copy", "email"]),
+                "tone": rng.choice(TONES), "keywords": "growth", "length": rng.choice(["short", "medium", "long"])})
+        if op == "chat":
+            return await post("/api/chat", headers=self.auth, json={"message": rng.choice(MESSAGES)})
+        if op == "sentiment":
+            return await post("/api/sentiment-analyze", headers=self.auth, json={"text": rng.choice(REVIEWS)})
+        return await self.client.get(f"/api/brand-kit/{self.project_id}", headers=self.auth)
+
+
+async def run(args):
+    import httpx
+    import main
+
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    ops, weights = list(mix), list(mix.values())
+    headers = {"Cache-Control": "no-cache"} if args.no_cache else {}
+    latencies, errors = defaultdict(list), defaultdict(int)
+
+    # The ASGI transport sends no lifespan events, so run startup/shutdown around the client
+    async with main.app.router.lifespan_context(main.app), \
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://load", timeout=60) as client:
+        users = [VirtualUser(client, i, headers) for i in range(args.users)]
+        for user in users:
+            await user.setup()
+
+        deadline = time.perf_counter() + args.duration
+
+        async def loop(user: VirtualUser):
+            while time.perf_counter() < deadline:
+                op = user.rng.choices(ops, weights)[0]
+                start = time.perf_counter()
+                response = await user.run(op)
+                latencies[op].append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors[op] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(loop(user) for user in users))
+        elapsed = time.perf_counter() - start
+
+    def summarize(samples, error_count):
+        return {
+            "requests": len(samples),
+            "errors": error_count,
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        }
+
+    results = {op: summarize(latencies[op], errors[op]) for op in ops}
+    results["total"] = summarize([s for op in ops for s in latencies[op]], sum(errors.values()))
+    print(f"{args.users} users for {elapsed:.1f}s, mix {mix}")
+    print(f"{'operation':12s} {'requests':>9s} {'errors':>7s} {'rps':>9s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for op, r in results.items():
+        print(f"{op:12s} {r['requests']:9d} {r['errors']:7d} {r['rps']:9.1f} "
+              f"{r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f}")
+    return results, mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--mix", default=None, help="weighted operations, e.g. login=5,content=20,brand_kit=25")
+    parser.add_argument("--bcrypt-rounds", type=int, default=None,
+                        help="override BCRYPT_ROUNDS (the production cost dominates login-heavy mixes)")
+    parser.add_argument("--no-cache", action="store_true", help="send Cache-Control: no-cache on every request")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="keep per-user rate limits on (off by default: every virtual user shares one IP)")
+    parser.add_argument("--json", default=None, help="write machine-readable results here ('-' for stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        os.environ["LOGO_CACHE_DIR"] = os.path.join(tmp, "logos")
+        os.environ["RATE_LIMIT_ENABLED"] = "1" if args.rate_limit else "0"
+        if args.bcrypt_rounds:
+            os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+        results, mix = asyncio.run(run(args))
+
+    if args.json:
+        write_results(args.json, "load", results, users=args.users, duration=args.duration, mix=mix,
+                      no_cache=args.no_cache, bcrypt_rounds=args.bcrypt_rounds, rate_limit=args.rate_limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Micro-benchmarks for the BrandCraft hot paths: every mock_ai generator,
+auth token creation and get_current_user (cold and cached), and the ORM
+write paths (per-row commit as in the routes, Core bulk insert as in the
+write-behind queue, and write-behind enqueue), and the chat context build
+(cold load from chat_history vs the buffered conversation). Runs against a
+scratch SQLite file.
+
+Usage: python benchmarks/micro_bench.py [--min-time 0.2] [--filter auth] [--json out.json]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from results import write_results
+
+SAMPLES = 7
+LOREM = "Great product, fast shipping but the support team was slow and the manual is poor. " * 3
+
+
+def measure(fn, min_time: float) -> dict:
+    """Time `fn()` in SAMPLES samples of n calls, n calibrated so a sample takes ~min_time / SAMPLES."""
+    target = min_time / SAMPLES
+    n = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target or n >= 1 << 20:
+            break
+        n *= 2 if elapsed == 0 else max(2, min(10, int(target / elapsed) + 1))
+    per_call = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        per_call.append((time.perf_counter() - start) / n)
+    median = statistics.median(per_call)
+    return {
+        "median_us": round(median * 1e6, 3),
+        "min_us": round(min(per_call) * 1e6, 3),
+        "stdev_us": round(statistics.stdev(per_call) * 1e6, 3),
+        "ops_per_sec": round(1 / median, 1) if median else None,
+        "calls_per_sample": n,
+    }
+
+
+def generator_benches():
+    import mock_ai
+
+    rng = random.Random(1)
+    return {
+        "mock_ai.generate_brand_names": lambda: mock_ai.generate_brand_names(
+            "technology", "cloud, ai", "developers", "modern", rng=rng),
+        "mock_ai.generate_logo_urls": lambda: mock_ai.generate_logo_urls("Nova", "modern", "#6c5ce7", "#00cec9"),
+        "mock_ai.generate_brand_identity": lambda: mock_ai.generate_brand_identity("Nova", "technology", "developers"),
+        "mock_ai.generate_content[blog,long]": lambda: mock_ai.generate_content(
+            "Nova", "blog", "professional", "cloud, ai", "long"),
+        "mock_ai.generate_content_bulk[50]": lambda: mock_ai.generate_content_bulk(
+            [f"Brand{i}" for i in range(50)], "social_post", ["playful"], "ai", "short"),
+        "mock_ai.analyze_sentiment": lambda: mock_ai.analyze_sentiment(LOREM, rng=rng),
+        "mock_ai.chat_response": lambda: mock_ai.chat_response("Can you help with a SWOT analysis?", ""),
+        "mock_ai.chat_response_stream": lambda: list(mock_ai.chat_response_stream("Plan a campaign", "")),
+    }
+
+
+def auth_benches():
+    import auth
+    import models
+    from database import SessionLocal
+
+    db = SessionLocal()
+    user = models.User(username="bench", email="bench@example.com", hashed_password=auth.hash_password("pw", rounds=4))
+    db.add(user)
+    db.commit()
+    token = auth.create_access_token({"sub": str(user.id)})
+
+    def cold():
+        auth.token_cache.clear()
+        auth.user_cache.clear()
+        auth.get_current_user(token, db)
+
+    return {
+        "auth.create_access_token": lambda: auth.create_access_token({"sub": str(user.id)}),
+        "auth.get_current_user[cold]": cold,
+        "auth.get_current_user[cached]": lambda: auth.get_current_user(token, db),
+    }
+
+
+def orm_benches():
+    import models
+    from database import SessionLocal
+    from sqlalchemy import insert
+    from write_behind import WriteBehindQueue
+
+    def per_row_commit():
+        db = SessionLocal()
+        try:
+            db.add(models.ChatHistory(user_id=1, message="hello", response="response " * 50))
+            db.commit()
+        finally:
+            db.close()
+
+    rows = [{"user_id": 1, "message": f"message {i}", "response": "response " * 50} for i in range(200)]
+
+    def bulk_insert_200():
+        with SessionLocal() as db:
+            db.execute(insert(models.ChatHistory), rows)
+            db.commit()
+
+    queue = WriteBehindQueue(max_batch=500, flush_interval=0.05)
+
+    def enqueue():
+        queue.enqueue(models.ChatHistory, {"user_id": 1, "message": "hello", "response": "hi"})
+
+    return {
+        "orm.insert_commit_per_row": per_row_commit,
+        "orm.core_bulk_insert[200 rows]": bulk_insert_200,
+        "write_behind.enqueue": enqueue,
+    }, queue
+
+
+def conversation_benches():
+    import models
+    from database import SessionLocal
+    from conversation import ConversationStore
+    from datetime import datetime, timedelta
+    from sqlalchemy import insert
+
+    start = datetime.utcnow() - timedelta(days=1)
+    with SessionLocal() as db:
+        db.execute(insert(models.ChatHistory), [
+            {"user_id": 42, "message": f"campaign question {i}", "response": "**Marketing Campaign Ideas:**\n" * 20,
+             "created_at": start + timedelta(seconds=i)} for i in range(500)])
+        db.commit()
+    store = ConversationStore()
+    db = SessionLocal()
+
+    def cold():
+        store.forget(42)
+        store.get(db, 42).render()
+
+    return {
+        "conversation.context[cold]": cold,
+        "conversation.context[buffered]": lambda: store.get(db, 42).render(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent measuring each benchmark")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--json", default=None, help="write machine-readable results here ('-' for stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["LOGO_CACHE_DIR"] = os.path.join(tmp, "logos")
+        from database import Base, engine
+        import models  # noqa: F401  (registers the tables)
+        Base.metadata.create_all(bind=engine)
+
+        orm, queue = orm_benches()
+        benches = {**generator_benches(), **auth_benches(), **orm, **conversation_benches()}
+        results = {}
+        for name, fn in benches.items():
+            if args.filter in name:
+                results[name] = measure(fn, args.min_time)
+                r = results[name]
+                print(f"{name:40s} {r['median_us']:12.2f} us/op  {r['ops_per_sec']:12.1f} ops/s  "
+                      f"(min {r['min_us']:.2f}, stdev {r['stdev_us']:.2f})")
+        queue.stop()
+        engine.dispose()
+
+    if args.json:
+        write_results(args.json, "micro", results, min_time=args.min_time)
+
+
+if __name__ == "__main__":
+    main()
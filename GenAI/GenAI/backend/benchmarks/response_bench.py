@@ -0,0 +1,81 @@
+"""
+Bytes-on-wire and latency benchmark for API response encoding.
+Drives the full app in-process (httpx ASGI transport, scratch SQLite file)
+and requests a long blog post, a chat reply and a page of projects under
+three configurations: stdlib JSON uncompressed, fast JSON uncompressed, and
+fast JSON with compression. Reports wire bytes, p50 and p99 per endpoint.
+
+Usage: python benchmarks/response_bench.py [--requests 300] [--projects 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from results import percentile
+
+CONFIGS = (
+    ("stdlib json, identity", False, "identity"),
+    ("fast json, identity", True, "identity"),
+    ("fast json, compressed", True, "gzip, br"),
+)
+
+
+async def run(requests: int, projects: int):
+    import httpx
+    import json_response
+    import main
+
+    # The ASGI transport sends no lifespan events, so run startup/shutdown around the client
+    async with main.app.router.lifespan_context(main.app), \
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        await client.post("/api/register", json={"username": "bench", "email": "bench@example.com", "password": "pw"})
+        login = await client.post("/api/login", json={"email": "bench@example.com", "password": "pw"})
+        auth = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        for i in range(projects):
+            await client.post("/api/projects", json={"name": f"Project {i}", "description": "Benchmark project " * 8},
+                              headers=auth)
+
+        endpoints = {
+            "content (blog, long)": ("POST", "/api/content-generate",
+                                     {"brand_name": "Nova", "content_type": "blog", "tone": "professional",
+                                      "keywords": "branding, growth", "length": "long"}),
+            "chat": ("POST", "/api/chat", {"message": "Help me with a SWOT analysis", "context": ""}),
+            f"projects (limit {projects})": ("GET", f"/api/projects?limit={projects}", None),
+        }
+        print(f"{requests} requests per endpoint and configuration")
+        for label, fast_json, accept_encoding in CONFIGS:
+            json_response.FAST_JSON = fast_json
+            headers = {**auth, "Accept-Encoding": accept_encoding}
+            print(f"\n{label}")
+            for name, (method, path, body) in endpoints.items():
+                latencies, wire = [], 0
+                for _ in range(requests):
+                    start = time.perf_counter()
+                    response = await client.request(method, path, json=body, headers=headers)
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200, response.text
+                    wire = response.num_bytes_downloaded
+                print(f"  {name:24s} {wire:8d} B on wire   p50 {percentile(latencies, 50) * 1000:6.2f} ms"
+                      f"   p99 {percentile(latencies, 99) * 1000:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--projects", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault("LOGO_CACHE_DIR", os.path.join(tmp, "logos"))
+        os.environ["RATE_LIMIT_ENABLED"] = "0"
+        asyncio.run(run(args.requests, args.projects))
+
+
+if __name__ == "__main__":
+    main()
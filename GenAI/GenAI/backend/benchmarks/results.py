@@ -0,0 +1,53 @@
+"""
+Shared helpers for the benchmark scripts: percentiles and machine-readable
+result files. A result file is JSON:
+
+    {"suite": "micro", "meta": {"commit": ..., "timestamp": ..., "python": ..., ...},
+     "results": {"<name>": {"<metric>": value, ...}, ...}}
+
+benchmarks/compare.py diffs two such files.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def metadata(**extra) -> dict:
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        **extra,
+    }
+
+
+def write_results(path: str, suite: str, results: dict, **meta):
+    """Write results to `path` ("-" for stdout)."""
+    document = {"suite": suite, "meta": metadata(**meta), "results": results}
+    if path == "-":
+        json.dump(document, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"results written to {path}")
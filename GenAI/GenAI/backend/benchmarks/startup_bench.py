@@ -0,0 +1,105 @@
+"""
+Cold-start benchmark for the BrandCraft API.
+Starts fresh interpreters and measures, per mode, the time to import main
+and the time for the lifespan startup (schema setup when AUTO_MIGRATE is on,
+cache warm-up) to finish:
+
+- development: AUTO_MIGRATE=1 on every boot (what every worker used to do)
+- production:  APP_ENV=production against a database migrated once up front
+
+Also reports the slowest imports from `python -X importtime`.
+
+Usage: python benchmarks/startup_bench.py [--runs 5] [--top 15] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from results import write_results
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CHILD = """
+import asyncio, json, sys, time
+sys.path.insert(0, {backend!r})
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def boot():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({{"import_ms": (imported - start) * 1000, "startup_ms": (ready - imported) * 1000}}))
+"""
+
+
+def boot_once(env: dict) -> dict:
+    output = subprocess.run([sys.executable, "-c", CHILD.format(backend=BACKEND)], env=env, cwd=BACKEND,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench_mode(env: dict, runs: int) -> dict:
+    samples = [boot_once(env) for _ in range(runs)]
+    result = {key: round(statistics.median(s[key] for s in samples), 2) for key in ("import_ms", "startup_ms")}
+    result["total_ms"] = round(result["import_ms"] + result["startup_ms"], 2)
+    return result
+
+
+def import_profile(env: dict, top: int) -> list:
+    """(module, self ms, cumulative ms) for the `top` slowest imports by self time."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {BACKEND!r}); import main"],
+                            env=env, cwd=BACKEND, capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((name, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return sorted(rows, key=lambda r: -r[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="boots per mode (median reported)")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--json", default=None, help="write machine-readable results here ('-' for stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = {**os.environ, "LOGO_CACHE_DIR": os.path.join(tmp, "logos")}
+        development = {**base, "APP_ENV": "development", "AUTO_MIGRATE": "1"}
+        production = {**base, "APP_ENV": "production", "AUTO_MIGRATE": "0",
+                      "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'prod.db')}"}
+        development["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'dev.db')}"
+
+        # Production databases are migrated once, out of band
+        subprocess.run([sys.executable, os.path.join(BACKEND, "migrations.py")], env=production,
+                        cwd=BACKEND, capture_output=True, check=True)
+        results = {"development": bench_mode(development, args.runs),
+                   "production": bench_mode(production, args.runs)}
+        slowest = import_profile(production, args.top)
+
+    print(f"median of {args.runs} cold boots")
+    for mode, r in results.items():
+        print(f"  {mode:12s} import {r['import_ms']:8.1f} ms   startup {r['startup_ms']:8.1f} ms   "
+              f"total {r['total_ms']:8.1f} ms")
+    print(f"\nslowest imports (self time)")
+    for name, self_ms, cumulative_ms in slowest:
+        print(f"  {name:40s} {self_ms:8.1f} ms self {cumulative_ms:9.1f} ms cumulative")
+
+    if args.json:
+        results["imports"] = {name: {"self_ms": s, "cumulative_ms": c} for name, s, c in slowest}
+        write_results(args.json, "startup", results, runs=args.runs)
+
+
+if __name__ == "__main__":
+    main()
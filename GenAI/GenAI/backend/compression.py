@@ -0,0 +1,71 @@
+"""
+Response compression middleware for the BrandCraft API.
+Complete (non-streaming) responses of a compressible type and at least
+COMPRESSION_MIN_SIZE bytes are gzip- or brotli-encoded, whichever the client
+prefers. Streaming responses (SSE chat, NDJSON sentiment) and bodies that are
+already encoded, such as the precompressed frontend, pass through untouched.
+"""
+import gzip
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from static_assets import brotli, parse_accept_encoding
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))  # gzip level; brotli uses quality 5
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+def compress(body: bytes, encoding: str, level: int = COMPRESSION_LEVEL) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE, level: int = COMPRESSION_LEVEL):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accepted = parse_accept_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        encoding = next((e for e in ENCODINGS if accepted.get(e, accepted.get("*", 0.0)) > 0), None)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start: Message = {}
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                return await send(message)
+            passthrough = True  # only the first body message is ever rewritten
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (message.get("more_body", False) or "content-encoding" in headers
+                    or len(body) < self.minimum_size
+                    or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)):
+                await send(start)
+                return await send(message)
+            compressed = compress(body, encoding, self.level)
+            headers.add_vary_header("Accept-Encoding")
+            if len(compressed) >= len(body):
+                await send(start)
+                return await send(message)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,154 @@
+"""
+Server-side conversation context for the BrandCraft chatbot.
+Each user's last CHAT_WINDOW turns are kept in an in-process ring buffer, so
+building the context for a message needs no database read once the buffer is
+warm. A cold buffer is filled with one indexed (user_id, created_at) query for
+the newest CHAT_WINDOW + CHAT_SUMMARY_SCAN turns, merged with this worker's
+turns still waiting in the write-behind queue.
+
+Turns that fall out of the window are rolled into a compact summary (the
+chat intents they touched, with counts), so the transcript handed to the
+generator stays bounded however long the conversation gets: at most
+CHAT_WINDOW turns of CHAT_TURN_CHARS characters each, plus one summary line.
+
+Buffers are per worker and are reloaded CHAT_BUFFER_TTL seconds after they
+were loaded, active or not; with several workers, that bounds how long a
+buffer can miss turns another worker served.
+"""
+import os
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+from cache import TTLCache
+from invalidation import bus
+from write_behind import write_queue
+import mock_ai
+import models
+
+CHAT_WINDOW = int(os.getenv("CHAT_WINDOW", "6"))  # turns kept verbatim
+CHAT_SUMMARY_SCAN = int(os.getenv("CHAT_SUMMARY_SCAN", "50"))  # older turns summarized on a cold load
+CHAT_TURN_CHARS = int(os.getenv("CHAT_TURN_CHARS", "200"))
+CHAT_SUMMARY_TOPICS = 5
+CHAT_BUFFER_USERS = int(os.getenv("CHAT_BUFFER_USERS", "4096"))
+CHAT_BUFFER_TTL = float(os.getenv("CHAT_BUFFER_TTL", "60"))  # seconds
+
+
+def _clip(text: str) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= CHAT_TURN_CHARS else text[:CHAT_TURN_CHARS - 1] + "…"
+
+
+def _headline(response: str) -> str:
+    """First non-empty line of a response; canned answers open with their topic."""
+    for line in (response or "").splitlines():
+        if line.strip():
+            return line.strip().strip("*").strip()
+    return ""
+
+
+@dataclass
+class Turn:
+    message: str
+    response: str
+    created_at: datetime
+
+
+class Conversation:
+    """Ring buffer of one user's recent turns plus a running summary of older ones."""
+
+    def __init__(self, window: int = CHAT_WINDOW, classify=mock_ai.chat_intents.classify):
+        self.turns = deque(maxlen=window)
+        self.topics = Counter()
+        self.summarized = 0
+        self.classify = classify
+        self._lock = threading.Lock()
+
+    def add(self, message: str, response: str, created_at: datetime = None):
+        turn = Turn(message, response, created_at or datetime.utcnow())
+        with self._lock:
+            if len(self.turns) == self.turns.maxlen:
+                self._summarize(self.turns[0])
+            self.turns.append(turn)
+
+    def _summarize(self, turn: Turn):
+        self.summarized += 1
+        for score in self.classify(turn.message):
+            self.topics[score.intent.name] += 1
+
+    def summary(self) -> str:
+        if not self.summarized:
+            return ""
+        topics = ", ".join(f"{name} x{count}" for name, count in self.topics.most_common(CHAT_SUMMARY_TOPICS))
+        return f"Earlier ({self.summarized} turns): {topics or 'general branding questions'}"
+
+    def last_message(self) -> str:
+        """The previous user message, clipped; what keyword routing may use as context."""
+        with self._lock:
+            return _clip(self.turns[-1].message) if self.turns else ""
+
+    def render(self) -> str:
+        """Transcript for the generator: summary line, then the recent turns oldest first."""
+        with self._lock:
+            lines = [self.summary()] if self.summarized else []
+            for turn in self.turns:
+                lines.append(f"User: {_clip(turn.message)}")
+                lines.append(f"Assistant: {_clip(_headline(turn.response))}")
+        return "\n".join(lines)
+
+
+class ConversationStore:
+    def __init__(self, window: int = CHAT_WINDOW, summary_scan: int = CHAT_SUMMARY_SCAN,
+                 maxsize: int = CHAT_BUFFER_USERS, ttl: float = CHAT_BUFFER_TTL):
+        self.window = window
+        self.summary_scan = summary_scan
+        self.loads = 0
+        self._buffers = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, db: Session, user_id: int) -> Conversation:
+        """The user's conversation, loaded from chat_history if it is not buffered."""
+        conversation = self._buffers.get(user_id)
+        if conversation is None:
+            conversation = self.load(db, user_id)
+            self._buffers.set(user_id, conversation)
+        return conversation
+
+    def load(self, db: Session, user_id: int) -> Conversation:
+        self.loads += 1
+        # Snapshot the unflushed turns first: a row flushed while we query is then
+        # in both lists (and deduplicated) rather than in neither
+        pending = [row for row in write_queue.pending_rows(models.ChatHistory) if row["user_id"] == user_id]
+        rows = (db.query(models.ChatHistory.message, models.ChatHistory.response, models.ChatHistory.created_at)
+                .filter(models.ChatHistory.user_id == user_id)
+                .order_by(models.ChatHistory.created_at.desc(), models.ChatHistory.id.desc())
+                .limit(self.window + self.summary_scan).all())
+        stored = {(row.created_at, row.message) for row in rows}
+        turns = [(row.created_at, row.message, row.response) for row in reversed(rows)]
+        turns += [(row["created_at"], row["message"], row["response"]) for row in pending
+                  if (row["created_at"], row["message"]) not in stored]
+        turns = sorted(turns, key=lambda turn: turn[0])[-(self.window + self.summary_scan):]
+        conversation = Conversation(self.window)
+        for created_at, message, response in turns:
+            conversation.add(message, response, created_at)
+        return conversation
+
+    def record(self, user_id: int, message: str, response: str, created_at: datetime = None):
+        """Append a turn to a buffered conversation (the row itself goes through write-behind)."""
+        conversation = self._buffers.get(user_id)
+        if conversation is not None:
+            # Not re-set: the buffer still expires CHAT_BUFFER_TTL after it was loaded
+            conversation.add(message, response, created_at)
+
+    def forget(self, user_id: int):
+        self._buffers.delete(user_id)
+
+    def stats(self) -> dict:
+        return {**self._buffers.stats(), "loads": self.loads, "window": self.window}
+
+
+conversations = ConversationStore()
+
+# A deleted user's id can be reused on register
+bus.subscribe("user", lambda key: conversations.forget(int(key)))
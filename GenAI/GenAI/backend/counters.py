@@ -0,0 +1,133 @@
+"""
+Materialized row counters and per-day API call counts for the admin dashboard.
+Every INSERT/DELETE on a tracked table, whether from an ORM flush or a Core
+bulk insert (write-behind queue, batch sentiment), bumps its stat_counters row
+on the same connection, so the counter commits or rolls back with the write.
+
+Usage: python counters.py   (recompute all counters from the base tables)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import threading
+import time
+from datetime import date
+
+from sqlalchemy import event, func, select, update, insert
+from sqlalchemy.sql.dml import Insert, Delete
+from sqlalchemy.orm import Session
+from database import engine as default_engine, SessionLocal
+import models
+
+TRACKED_TABLES = ("users", "projects", "generated_content", "sentiment_reports", "chat_history", "brand_assets")
+API_CALL_FLUSH_INTERVAL = 30  # seconds between persisting in-memory API call counts
+
+_counter_table = models.StatCounter.__table__
+
+
+def _track_writes(conn, clauseelement, multiparams, params, execution_options, result):
+    if not isinstance(clauseelement, (Insert, Delete)) or clauseelement.table.name not in TRACKED_TABLES:
+        return
+    if isinstance(clauseelement, Insert):
+        # Batched ORM inserts report rowcount 1, but always pass one parameter set per row
+        delta = len(multiparams) or 1
+    else:
+        delta = -result.rowcount
+    if delta:
+        conn.execute(update(_counter_table)
+                     .where(_counter_table.c.name == clauseelement.table.name)
+                     .values(value=_counter_table.c.value + delta))
+
+
+def install(bind=default_engine):
+    """Start maintaining counters for writes made through `bind`."""
+    if not event.contains(bind, "after_execute", _track_writes):
+        event.listen(bind, "after_execute", _track_writes)
+
+
+def reconcile(db: Session) -> dict:
+    """Recompute every counter from COUNT(*) on its base table."""
+    counts = {}
+    for table in models.Base.metadata.sorted_tables:
+        if table.name in TRACKED_TABLES:
+            counts[table.name] = db.execute(select(func.count()).select_from(table)).scalar()
+    db.execute(_counter_table.delete())
+    db.execute(insert(_counter_table), [{"name": name, "value": value} for name, value in counts.items()])
+    db.commit()
+    return counts
+
+
+def ensure_counters(db: Session):
+    """Seed the counters on first start (or after a new table is tracked)."""
+    existing = {row.name for row in db.query(models.StatCounter.name)}
+    if existing != set(TRACKED_TABLES):
+        reconcile(db)
+
+
+def get_counts(db: Session) -> dict:
+    return {row.name: row.value for row in db.query(models.StatCounter)}
+
+
+class ApiCallCounter:
+    """Counts API calls per day in memory and persists them to api_call_counts periodically."""
+
+    def __init__(self, flush_interval: float = API_CALL_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self):
+        today = date.today()
+        with self._lock:
+            self._pending[today] = self._pending.get(today, 0) + 1
+
+    def due(self) -> bool:
+        return time.monotonic() - self._last_flush >= self.flush_interval
+
+    def flush(self, db: Session = None):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            for day, count in pending.items():
+                updated = db.execute(update(models.ApiCallCount)
+                                     .where(models.ApiCallCount.day == day)
+                                     .values(count=models.ApiCallCount.count + count)).rowcount
+                if not updated:
+                    db.add(models.ApiCallCount(day=day, count=count))
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:  # keep the counts for the next flush
+                for day, count in pending.items():
+                    self._pending[day] = self._pending.get(day, 0) + count
+            raise
+        finally:
+            if own_session:
+                db.close()
+
+    def today(self, db: Session) -> int:
+        today = date.today()
+        row = db.get(models.ApiCallCount, today)
+        with self._lock:
+            pending = self._pending.get(today, 0)
+        return (row.count if row else 0) + pending
+
+
+api_calls = ApiCallCounter()
+
+
+if __name__ == "__main__":
+    models.Base.metadata.create_all(bind=default_engine)
+    db = SessionLocal()
+    try:
+        for name, value in reconcile(db).items():
+            print(f"{name:20s} {value}")
+    finally:
+        db.close()
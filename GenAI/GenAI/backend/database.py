@@ -1,15 +1,84 @@
-from sqlalchemy import create_engine
+import os
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session, sessionmaker, declarative_base
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./brandcraft.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./brandcraft.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Async driver per backend, whichever sync driver the URL names (postgresql+psycopg2 -> postgresql+asyncpg)
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,  # negative = KiB, i.e. 64 MB
+    "busy_timeout": 5000,  # ms
+}
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def _engine_kwargs(url) -> dict:
+    if url.get_backend_name() == "sqlite":
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_pre_ping": True,
+    }
+
+
+def create_db_engine(database_url: str = SQLALCHEMY_DATABASE_URL, tune_sqlite: bool = True):
+    """Create a sync engine; SQLite connections get SQLITE_PRAGMAS unless tune_sqlite is False."""
+    url = make_url(database_url)
+    db_engine = create_engine(url, **_engine_kwargs(url))
+    if tune_sqlite and url.get_backend_name() == "sqlite":
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+def async_url(database_url: str):
+    """`database_url` with its backend's async driver."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url
+
+
+def create_async_db_engine(database_url: str = SQLALCHEMY_DATABASE_URL, tune_sqlite: bool = True):
+    """Create an async engine for the same database, swapping in the backend's async driver."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_url(database_url)
+    db_engine = create_async_engine(url, **_engine_kwargs(url))
+    if tune_sqlite and url.get_backend_name() == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Created on first use so the async driver is only required by routes that need it
+async_engine = None
+AsyncSessionLocal = None
+_async_init_lock = threading.Lock()
+
 
 def get_db() -> Generator[Session, None, None]:
     """Database dependency for FastAPI routes."""
@@ -18,3 +87,28 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_async_sessionmaker():
+    """The async session factory, creating its engine exactly once."""
+    global async_engine, AsyncSessionLocal
+    if AsyncSessionLocal is None:
+        with _async_init_lock:
+            if AsyncSessionLocal is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker
+
+                async_engine = create_async_db_engine()
+                AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return AsyncSessionLocal
+
+
+async def get_async_db() -> AsyncGenerator:
+    """Async database dependency for FastAPI routes."""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def dispose_async_db():
+    """Close the async engine's pool, if one was created (app shutdown)."""
+    if async_engine is not None:
+        await async_engine.dispose()
@@ -0,0 +1,230 @@
+"""
+Generation backends and the asyncio dispatcher in front of them.
+Routes ask the dispatcher for a task ("content", "brand_names", ...) instead
+of calling mock_ai directly. The dispatcher applies the backend's concurrency
+limit and timeout, lets identical in-flight requests share one result, and
+groups compatible requests into micro-batches for backends that support it.
+Streaming requests go through Dispatcher.stream, which applies the same
+limit and timeout to each event the backend yields.
+MockBackend (mock_ai) is the default; a real model server plugs in by
+subclassing GenerationBackend.
+"""
+import asyncio
+import os
+import random
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+import mock_ai
+from response_cache import make_key
+from singleflight import SingleFlight
+from sentiment_engine import engine as sentiment_engine
+
+
+class GenerationBackend:
+    """Interface for anything that can run generation tasks."""
+
+    name = "base"
+    max_concurrency = 8
+    timeout = 30.0  # seconds per call
+    max_batch_size = 1  # > 1 enables micro-batching for batchable tasks
+    batch_window = 0.005  # seconds to wait for a micro-batch to fill
+
+    async def generate(self, task: str, **params) -> Any:
+        raise NotImplementedError
+
+    def batchable(self, task: str) -> bool:
+        return False
+
+    async def stream(self, task: str, **params) -> AsyncIterator[dict]:
+        """Yield `task`'s text as {"delta": ...} events, then one event with the rest of the result.
+
+        The default generates the whole result first; backends that produce text
+        incrementally override it.
+        """
+        result = dict(await self.generate(task, **params))
+        text = result.pop("response", "")
+        if text:
+            yield {"delta": text}
+        yield result
+
+    async def generate_batch(self, task: str, params_list: List[dict]) -> list:
+        """Run several compatible requests at once; the default just runs them one by one."""
+        return [await self.generate(task, **params) for params in params_list]
+
+
+class MockBackend(GenerationBackend):
+    """The in-process mock_ai generators. `seed` makes the random-based tasks repeatable.
+
+    The generators are synchronous (and logos are written to disk), so they run in the
+    threadpool rather than on the event loop.
+    """
+
+    name = "mock"
+    max_batch_size = 64
+
+    def _rng(self, seed):
+        return random.Random(seed) if seed is not None else random
+
+    async def generate(self, task: str, seed: Optional[int] = None, **params) -> Any:
+        return await run_in_threadpool(self._generate, task, seed, params)
+
+    def _generate(self, task: str, seed: Optional[int], params: dict) -> Any:
+        if task == "brand_names":
+            return mock_ai.generate_brand_names(**params, rng=self._rng(seed))
+        if task == "logos":
+            return mock_ai.generate_logo_urls(**params)
+        if task == "brand_identity":
+            return mock_ai.generate_brand_identity(**params)
+        if task == "content":
+            return mock_ai.generate_content(**params)
+        if task == "sentiment":
+            return mock_ai.analyze_sentiment(**params, rng=self._rng(seed))
+        if task == "chat":
+            # Keyword routing only; the `history` transcript is for model-backed generators
+            return mock_ai.chat_response(params["message"], params.get("context", ""))
+        raise ValueError(f"Unknown generation task: {task}")
+
+    def batchable(self, task: str) -> bool:
+        return task == "sentiment"
+
+    async def stream(self, task: str, **params) -> AsyncIterator[dict]:
+        if task != "chat":
+            async for event in super().stream(task, **params):
+                yield event
+            return
+        # Each chunk is produced on a threadpool thread as the consumer asks for it
+        async for event in iterate_in_threadpool(mock_ai.chat_response_stream(params["message"],
+                                                                              params.get("context", ""))):
+            yield event
+
+    async def generate_batch(self, task: str, params_list: List[dict]) -> list:
+        if task != "sentiment":
+            return await super().generate_batch(task, params_list)
+        return await run_in_threadpool(self._score_sentiment_batch, params_list)
+
+    def _score_sentiment_batch(self, params_list: List[dict]) -> list:
+        # One lexicon pass over the whole batch, then per-request seeded scoring
+        counts = sentiment_engine.count([p["text"] for p in params_list])
+        return mock_ai.sentiment_batch(counts, [self._rng(p.get("seed")) for p in params_list])
+
+
+class SimulatedLatencyBackend(MockBackend):
+    """Stand-in for a model server: mock_ai output after a fixed delay per call (or per batch)."""
+
+    name = "simulated"
+
+    def __init__(self, latency: float = 0.2, max_concurrency: int = 4, timeout: float = 30.0,
+                 token_latency: float = 0.01):
+        self.latency = latency
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.token_latency = token_latency  # seconds per streamed event
+        self.calls = 0
+        self.batches = 0
+        self.streamed = 0
+
+    async def generate(self, task: str, **params) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return await super().generate(task, **params)
+
+    async def generate_batch(self, task: str, params_list: List[dict]) -> list:
+        self.batches += 1
+        await asyncio.sleep(self.latency)
+        return await super().generate_batch(task, params_list)
+
+    async def stream(self, task: str, **params) -> AsyncIterator[dict]:
+        async for event in super().stream(task, **params):
+            await asyncio.sleep(self.token_latency)
+            self.streamed += 1
+            yield event
+
+
+class Dispatcher:
+    def __init__(self, backend: GenerationBackend):
+        self.backend = backend
+        self.timeouts = 0
+        self._semaphore = asyncio.Semaphore(backend.max_concurrency)
+        self._flight = SingleFlight()
+        self._batches: Dict[str, list] = {}
+        self._batch_timers: Dict[str, asyncio.TimerHandle] = {}
+
+    async def submit(self, task: str, **params) -> Any:
+        """Run `task` on the backend; identical concurrent calls share one result."""
+        return await self._flight.do(make_key(task, params), lambda: self._execute(task, params))
+
+    async def _execute(self, task: str, params: dict) -> Any:
+        if self.backend.batchable(task) and self.backend.max_batch_size > 1:
+            return await self._submit_batched(task, params)
+        return await self._run(self.backend.generate(task, **params))
+
+    async def _run(self, coro):
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(coro, self.backend.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise HTTPException(status_code=504, detail=f"{self.backend.name} backend timed out")
+
+    async def _submit_batched(self, task: str, params: dict) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        batch = self._batches.setdefault(task, [])
+        batch.append((params, future))
+        if len(batch) == 1:
+            self._batch_timers[task] = asyncio.get_running_loop().call_later(
+                self.backend.batch_window, self._flush_batch, task)
+        if len(batch) >= self.backend.max_batch_size:
+            self._flush_batch(task)
+        return await future
+
+    async def stream(self, task: str, **params) -> AsyncIterator[dict]:
+        """Yield `task`'s events as the backend produces them (not coalesced or batched).
+
+        The stream holds a concurrency slot until it ends. The backend timeout applies to
+        the first event and to each gap between events.
+        """
+        async with self._semaphore:
+            events = self.backend.stream(task, **params)
+            try:
+                while True:
+                    try:
+                        event = await asyncio.wait_for(events.__anext__(), self.backend.timeout)
+                    except StopAsyncIteration:
+                        return
+                    except asyncio.TimeoutError:
+                        self.timeouts += 1
+                        raise HTTPException(status_code=504, detail=f"{self.backend.name} backend timed out")
+                    yield event
+            finally:
+                await events.aclose()
+
+    def _flush_batch(self, task: str):
+        timer = self._batch_timers.pop(task, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._batches.pop(task, None)
+        if batch:
+            asyncio.ensure_future(self._run_batch(task, batch))
+
+    async def _run_batch(self, task: str, batch: list):
+        try:
+            results = await self._run(self.backend.generate_batch(task, [p for p, _ in batch]))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {"backend": self.backend.name, "timeouts": self.timeouts, **self._flight.stats()}
+
+
+BACKENDS = {"mock": MockBackend}
+GENERATION_BACKEND = os.getenv("GENERATION_BACKEND", "mock")
+
+dispatcher = Dispatcher(BACKENDS[GENERATION_BACKEND]())
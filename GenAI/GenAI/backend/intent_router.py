@@ -0,0 +1,130 @@
+"""
+Keyword intent routing for the BrandCraft chatbot.
+All intent keywords are compiled into one Aho-Corasick automaton, so a
+message is classified in a single pass over its characters no matter how
+many intents are registered. Matching is by substring, like `kw in message`.
+"""
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher; patterns map to arbitrary values."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._own: List[list] = [[]]  # values of the patterns ending exactly at each node
+        self._lock = threading.Lock()
+        self._compiled = None  # (goto, fail, out) searched by iter_matches; None until (re)built
+
+    def add(self, pattern: str, value: Any):
+        with self._lock:
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._own.append([])
+                node = nxt
+            self._own[node].append(value)
+            self._compiled = None
+
+    def build(self):
+        """Compile the automaton; called lazily before the first search after an `add`."""
+        with self._lock:
+            if self._compiled is None:
+                self._compiled = self._compile()
+            return self._compiled
+
+    def _compile(self):
+        # A fresh snapshot every time: searches in flight keep the old one, and outputs are
+        # recomputed from each node's own patterns rather than merged on top of a previous build
+        goto = [dict(edges) for edges in self._goto]
+        fail = [0] * len(goto)
+        out = [list(values) for values in self._own]
+        # Children of the root keep fail = 0; deeper nodes follow their parent's failure chain.
+        # Breadth-first, so a node's failure target (always shallower) already has its full output
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                link = fail[node]
+                while link and ch not in goto[link]:
+                    link = fail[link]
+                fail[child] = goto[link].get(ch, 0)
+                out[child] += out[fail[child]]
+        return goto, fail, out
+
+    def iter_matches(self, text: str):
+        """Yield the value of every pattern occurrence in `text`."""
+        goto, fail, out = self._compiled or self.build()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                yield from out[node]
+
+
+@dataclass
+class Intent:
+    name: str
+    keywords: List[str]
+    payload: Any = None
+    weight: float = 1.0
+    order: int = 0
+
+
+@dataclass
+class IntentScore:
+    intent: Intent
+    score: float
+    matched: List[str] = field(default_factory=list)
+
+
+class IntentRouter:
+    """Scores registered intents against a message; `context` only breaks ties between the message's intents."""
+
+    CONTEXT_WEIGHT = 0.5
+
+    def __init__(self):
+        self.intents: Dict[str, Intent] = {}
+        self._automaton = AhoCorasick()
+
+    def register(self, name: str, keywords: List[str], payload: Any = None, weight: float = 1.0) -> Intent:
+        intent = Intent(name, [k.lower() for k in keywords], payload, weight, order=len(self.intents))
+        self.intents[name] = intent
+        for keyword in intent.keywords:
+            self._automaton.add(keyword, (intent, keyword))
+        return intent
+
+    def build(self):
+        """Compile the automaton now rather than on the first message (startup warm-up)."""
+        self._automaton.build()
+
+    def classify(self, message: str, context: str = "") -> List[IntentScore]:
+        """Return matching intents, best first; ties go to the intent registered first."""
+        scores: Dict[str, IntentScore] = {}
+        for intent, keyword in self._automaton.iter_matches(message.lower()):
+            entry = scores.setdefault(intent.name, IntentScore(intent, 0.0))
+            entry.score += intent.weight
+            if keyword not in entry.matched:
+                entry.matched.append(keyword)
+        # Context (e.g. the previous turn) counts once per intent, and only for intents the
+        # message itself matched: it never routes a keyword-less message on its own
+        if context and scores:
+            for name in {intent.name for intent, _ in self._automaton.iter_matches(context.lower())}:
+                if name in scores:
+                    scores[name].score += scores[name].intent.weight * self.CONTEXT_WEIGHT
+        return sorted(scores.values(), key=lambda s: (-s.score, s.intent.order))
+
+    def route(self, message: str, context: str = ""):
+        """Return the best-scoring intent, or None when no keyword matches."""
+        ranked = self.classify(message, context)
+        return ranked[0].intent if ranked else None
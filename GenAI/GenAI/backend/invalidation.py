@@ -0,0 +1,174 @@
+"""
+Cross-process cache invalidation for multi-worker deployments.
+Each worker keeps its own caches (shared-nothing). Writes that make cached
+state stale publish an event into the invalidation_events table *in the same
+transaction as the write*; every worker tails that table and runs the local
+handlers subscribed to the event's topic.
+
+Enabled automatically when WEB_CONCURRENCY > 1 (read by uvicorn --workers and
+gunicorn alike), or with INVALIDATION_BUS=1. Run with N workers:
+
+    python migrations.py                       # once per release
+    APP_ENV=production WEB_CONCURRENCY=4 python main.py
+    # or: gunicorn main:app -k uvicorn.workers.UvicornWorker -w 4 --preload
+
+Topics, keyed by id: "user" (suspend, delete, id reuse on register) drops the
+cached user snapshot; "project" (delete) drops the cached owner and brand kit
+of a project; "brand_asset" (keyed by project id: save, delete) drops the
+cached brand kit of that project.
+
+Consistency guarantees:
+- An event exists iff its write committed: it is inserted by the same session
+  and transaction, so a rolled-back write never invalidates anything.
+- The worker that handled the write invalidates right after commit (its own
+  requests see the change immediately).
+- Other workers apply it within INVALIDATION_POLL_INTERVAL plus query time.
+  If the tailing thread cannot reach the database, staleness is bounded by the
+  cache's own TTL (user snapshots: 60 s).
+- Events are tailed by id. SQLite serializes writers, so ids commit in
+  order there. PostgreSQL/MySQL hand out ids before commit, so a later id can
+  become visible first: ids skipped by a poll are re-checked on every poll
+  for INVALIDATION_GAP_TIMEOUT, so an event whose transaction commits within
+  that window is still applied; a transaction committing later than that
+  leaves its event unseen and the entry goes stale until the cache's own TTL.
+  Ids that never appear (rolled back, sequence caching) age out the same way.
+- Events may therefore be applied out of id order; handlers must be
+  idempotent and order-independent (they only drop cache entries).
+- A worker starts tailing from the newest event at boot; it has no cached
+  state yet, so nothing older can be stale for it. Events older than
+  INVALIDATION_RETENTION are pruned.
+
+Not covered, by design: rate-limit buckets and the response cache stay
+per-worker (a user can reach N x quota across N workers without sticky
+routing; cached generator output is never stale), and per-worker API call
+counts reach the dashboard on each worker's next periodic flush.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from sqlalchemy import delete, event, func, or_, select
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import InvalidationEvent
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+INVALIDATION_BUS = os.getenv("INVALIDATION_BUS", "1" if WORKERS > 1 else "0") == "1"
+INVALIDATION_POLL_INTERVAL = float(os.getenv("INVALIDATION_POLL_INTERVAL", "0.25"))  # seconds
+INVALIDATION_RETENTION = float(os.getenv("INVALIDATION_RETENTION", "600"))  # seconds
+INVALIDATION_GAP_TIMEOUT = float(os.getenv("INVALIDATION_GAP_TIMEOUT", "30"))  # seconds
+PRUNE_INTERVAL = 60  # seconds between prunes of old events
+MAX_GAPS = 1000  # skipped ids re-checked per poll; a larger jump is not tracked
+
+
+class InvalidationBus:
+    def __init__(self, session_factory=SessionLocal, enabled: bool = INVALIDATION_BUS,
+                 poll_interval: float = INVALIDATION_POLL_INTERVAL, retention: float = INVALIDATION_RETENTION,
+                 gap_timeout: float = INVALIDATION_GAP_TIMEOUT):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.gap_timeout = gap_timeout
+        self.origin = uuid.uuid4().hex
+        self.handlers: Dict[str, List[Callable[[str], None]]] = defaultdict(list)
+        self.published = 0
+        self.applied = 0
+        self.last_id = None
+        self._gaps: Dict[int, float] = {}  # skipped ids below last_id -> when first skipped
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_prune = 0.0
+
+    def subscribe(self, topic: str, handler: Callable[[str], None]):
+        """Run `handler(key)` for every `topic` event, from this process or any other."""
+        self.handlers[topic].append(handler)
+
+    def publish(self, db: Session, topic: str, key):
+        """Record an invalidation in `db`'s transaction; handlers run once it commits."""
+        key = str(key)
+        if self.enabled:
+            db.add(InvalidationEvent(topic=topic, key=key, origin=self.origin))
+            self.published += 1
+        # Invalidate locally only after commit, so a concurrent request cannot
+        # re-cache the old row between invalidation and commit
+        event.listen(db, "after_commit", lambda session: self._dispatch(topic, key), once=True)
+
+    def _dispatch(self, topic: str, key: str):
+        for handler in self.handlers.get(topic, ()):
+            try:
+                handler(key)
+            except Exception:
+                logger.exception("invalidation handler failed for %s:%s", topic, key)
+
+    # ─── tailing ───
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        with self.session_factory() as db:
+            self.last_id = db.execute(select(func.max(InvalidationEvent.id))).scalar() or 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("invalidation bus poll failed")
+
+    def poll(self) -> int:
+        """Apply events newer than the last one seen, or filling a skipped id; returns how many were applied."""
+        now = time.monotonic()
+        with self.session_factory() as db:
+            newer = InvalidationEvent.id > self.last_id
+            if self._gaps:
+                newer = or_(newer, InvalidationEvent.id.in_(list(self._gaps)))
+            rows = db.execute(select(InvalidationEvent.id, InvalidationEvent.topic, InvalidationEvent.key,
+                                     InvalidationEvent.origin)
+                              .where(newer)
+                              .order_by(InvalidationEvent.id)).all()
+            applied = 0
+            for row in rows:
+                if self._gaps.pop(row.id, None) is None and row.id > self.last_id + 1:
+                    self._track_gap(self.last_id + 1, row.id, now)
+                if row.origin != self.origin:
+                    self._dispatch(row.topic, row.key)
+                    applied += 1
+                self.last_id = max(self.last_id, row.id)
+            self.applied += applied
+            self._gaps = {gap: since for gap, since in self._gaps.items() if now - since < self.gap_timeout}
+            if time.monotonic() - self._last_prune >= PRUNE_INTERVAL:
+                self._last_prune = time.monotonic()
+                cutoff = datetime.utcnow() - timedelta(seconds=self.retention)
+                db.execute(delete(InvalidationEvent).where(InvalidationEvent.created_at < cutoff))
+                db.commit()
+        return applied
+
+    def _track_gap(self, first: int, end: int, now: float):
+        if end - first + len(self._gaps) > MAX_GAPS:
+            logger.warning("invalidation bus skipped %d ids after %d; not re-checking them", end - first, first - 1)
+            return
+        for gap in range(first, end):
+            self._gaps[gap] = now
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "origin": self.origin, "published": self.published,
+                "applied": self.applied, "last_id": self.last_id, "gaps": len(self._gaps)}
+
+
+bus = InvalidationBus()
@@ -0,0 +1,49 @@
+"""
+Fast JSON responses for the BrandCraft API.
+FastJSONResponse renders with orjson when it is installed and falls back to
+compact stdlib json otherwise; it is the app's default response class.
+orm_response serializes ORM rows straight to JSON bytes through a pydantic
+schema, skipping the model-instance + jsonable_encoder round trip.
+"""
+import json
+import os
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
+
+FAST_JSON = os.getenv("FAST_JSON", "1") == "1"
+
+
+def _default(obj):
+    return jsonable_encoder(obj)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is not None and FAST_JSON:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                          default=_default).encode("utf-8")
+
+
+def orm_response(adapter: TypeAdapter, data: Any, response: Optional[Response] = None) -> Response:
+    """Validate `data` (ORM objects) against `adapter` and return its JSON bytes directly.
+
+    Headers set on an injected `response` (e.g. the pagination cursor) are carried over,
+    since FastAPI does not merge them into a Response returned from the endpoint.
+    """
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    result = Response(body, media_type="application/json")
+    if response is not None:
+        for name, value in response.headers.items():
+            if name not in ("content-length", "content-type"):
+                result.headers[name] = value
+    return result
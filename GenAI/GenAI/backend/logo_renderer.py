@@ -0,0 +1,104 @@
+"""
+In-process SVG logo renderer for BrandCraft.
+Logos are drawn from brand_name/style/colors plus a per-variation seed, then
+stored in a content-addressed cache: the file name is the SHA-256 of the SVG,
+so a stored asset never changes and can be served as immutable.
+"""
+import hashlib
+import html
+import os
+import re
+import tempfile
+
+LOGO_CACHE_DIR = os.getenv("LOGO_CACHE_DIR", os.path.join(os.path.dirname(__file__), "asset_cache", "logos"))
+SIZE = 400
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+_HEX_COLOR = re.compile(r"^#?([0-9a-fA-F]{6}|[0-9a-fA-F]{3})$")
+_FONTS = {
+    "minimal": "Helvetica, Arial, sans-serif",
+    "modern": "'Segoe UI', Roboto, sans-serif",
+    "vintage": "Georgia, 'Times New Roman', serif",
+    "tech": "'Courier New', monospace",
+}
+
+
+def _color(value: str, fallback: str) -> str:
+    match = _HEX_COLOR.match(value or "")
+    return f"#{match.group(1).lower()}" if match else fallback
+
+
+def _initials(brand_name: str) -> str:
+    words = [w for w in re.split(r"\s+", brand_name.strip()) if w]
+    if not words:
+        return "?"
+    if len(words) == 1:
+        return words[0][:2].upper()
+    return (words[0][0] + words[1][0]).upper()
+
+
+def _shape(style: str, variant: int, primary: str, secondary: str) -> str:
+    c = SIZE / 2
+    if style == "minimal":
+        if variant % 2:
+            return f'<rect x="100" y="70" width="200" height="200" fill="none" stroke="{primary}" stroke-width="8"/>'
+        return f'<circle cx="{c}" cy="170" r="100" fill="none" stroke="{primary}" stroke-width="8"/>'
+    if style == "vintage":
+        dash = "" if variant % 2 else ' stroke-dasharray="6 6"'
+        return (f'<circle cx="{c}" cy="170" r="120" fill="{primary}"/>'
+                f'<circle cx="{c}" cy="170" r="106" fill="none" stroke="{secondary}" stroke-width="4"{dash}/>'
+                f'<circle cx="{c}" cy="170" r="92" fill="none" stroke="{secondary}" stroke-width="2"/>')
+    if style == "tech":
+        points = " ".join(f"{c + 115 * dx:.1f},{170 + 115 * dy:.1f}" for dx, dy in
+                          ((0, -1), (0.866, -0.5), (0.866, 0.5), (0, 1), (-0.866, 0.5), (-0.866, -0.5)))
+        grid = "".join(f'<line x1="{x}" y1="40" x2="{x}" y2="300" stroke="{secondary}" stroke-opacity="0.25"/>'
+                       for x in range(80 + variant * 5, 330, 40))
+        return f'{grid}<polygon points="{points}" fill="{primary}" stroke="{secondary}" stroke-width="6"/>'
+    # modern
+    radius = 24 + variant * 12
+    return (f'<defs><linearGradient id="g" x1="0" y1="0" x2="1" y2="1">'
+            f'<stop offset="0" stop-color="{primary}"/><stop offset="1" stop-color="{secondary}"/>'
+            f'</linearGradient></defs>'
+            f'<rect x="80" y="50" width="240" height="240" rx="{radius}" fill="url(#g)"/>')
+
+
+def render_logo_svg(brand_name: str, style: str, primary_color: str, secondary_color: str, seed: str) -> str:
+    """Render one logo variation; `seed` (hex) picks the variation's shape and rotation."""
+    primary = _color(primary_color, "#6c5ce7")
+    secondary = _color(secondary_color, "#00cec9")
+    style = style if style in _FONTS else "modern"
+    seed_value = int(seed, 16)
+    variant = seed_value % 4
+    rotation = (seed_value >> 4) % 3 * 15 - 15 if style in ("minimal", "tech") else 0
+    monogram_fill = primary if style == "minimal" else "#ffffff" if style != "vintage" else secondary
+    name = html.escape(brand_name.strip() or "Brand")
+    font = _FONTS[style]
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SIZE}" height="{SIZE}" viewBox="0 0 {SIZE} {SIZE}">'
+        f'<rect width="{SIZE}" height="{SIZE}" fill="{"#ffffff" if style == "minimal" else "#12121f"}"/>'
+        f'<g transform="rotate({rotation} {SIZE / 2} 170)">{_shape(style, variant, primary, secondary)}</g>'
+        f'<text x="{SIZE / 2}" y="170" dy=".35em" text-anchor="middle" font-family="{font}" font-size="72" '
+        f'font-weight="{700 if variant % 2 else 600}" fill="{monogram_fill}">{html.escape(_initials(brand_name))}</text>'
+        f'<text x="{SIZE / 2}" y="350" text-anchor="middle" font-family="{font}" font-size="34" '
+        f'letter-spacing="{variant}" fill="{secondary if style == "minimal" else primary}">{name}</text>'
+        f'</svg>'
+    )
+
+
+def store_asset(svg: str) -> str:
+    """Write the SVG to the cache (once) and return its SHA-256 digest."""
+    data = svg.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = asset_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(LOGO_CACHE_DIR, exist_ok=True)
+        # Write-then-rename so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=LOGO_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return digest
+
+
+def asset_path(digest: str) -> str:
+    return os.path.join(LOGO_CACHE_DIR, f"{digest}.svg")
@@ -1,21 +1,84 @@
 import sys
 import os
+import time
+import importlib
+import logging
+from contextlib import asynccontextmanager
 sys.path.insert(0, os.path.dirname(__file__))
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from database import engine, Base
-from routes import auth_routes, brand_routes, content_routes, sentiment_routes, chat_routes, project_routes, admin_routes
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from database import engine, dispose_async_db
+from migrations import setup_database
+from auth import hash_pool
+from write_behind import write_queue
+from invalidation import bus, WORKERS
+import counters
+import metrics
+import profiling
+from generation import dispatcher
+from response_cache import response_cache
+from static_assets import StaticAssets
+from json_response import FastJSONResponse
+from compression import CompressionMiddleware, COMPRESSION_ENABLED
+import mock_ai
+from sentiment_engine import engine as sentiment_engine
+
+logger = logging.getLogger("brandcraft")
+
+# APP_ENV=production: no schema work on boot (run `python migrations.py` once per
+# release) and no auto-reload. Importing this module touches no database, so it
+# is safe to preload once in a gunicorn master before forking workers.
+PRODUCTION = os.getenv("APP_ENV", "development") == "production"
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "0" if PRODUCTION else "1") == "1"
+RELOAD = os.getenv("RELOAD", "0") == "1"
+# Router modules (under routes/) this process serves; unlisted ones are never imported
+ROUTERS = [name.strip() for name in os.getenv(
+    "ROUTERS", "auth,brand,content,sentiment,chat,project,admin,asset").split(",") if name.strip()]
+
+# Keep the admin dashboard counters in step with every write
+counters.install(engine)
+
+# Pool checkout and query timings for /metrics
+metrics.install(engine)
+
+
+def warm_caches():
+    """Build what would otherwise be built on the first request."""
+    mock_ai.chat_intents.build()
+    mock_ai.template_registry.load()
+    sentiment_engine.count(["warm up"])
+    # Open the first pooled connection (and apply the SQLite pragmas)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start = time.perf_counter()
+    if AUTO_MIGRATE:
+        await run_in_threadpool(setup_database, engine)
+    await run_in_threadpool(warm_caches)
+    await run_in_threadpool(bus.start)
+    logger.info("startup complete in %.1f ms (auto_migrate=%s)", (time.perf_counter() - start) * 1000, AUTO_MIGRATE)
+    yield
+    bus.stop()
+    write_queue.stop()
+    counters.api_calls.flush()
+    hash_pool.shutdown()
+    await dispose_async_db()
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="BrandCraft API",
     description="AI-Powered Branding Automation System",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
 # CORS — allow frontend
@@ -25,16 +88,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "Retry-After"],
 )
 
+# gzip/brotli for large JSON and text bodies; streams and precompressed assets pass through
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+@app.middleware("http")
+async def count_api_calls(request: Request, call_next):
+    if request.url.path.startswith("/api/"):
+        counters.api_calls.record()
+        if counters.api_calls.due():
+            await run_in_threadpool(counters.api_calls.flush)
+    return await call_next(request)
+
+
+# Opt-in (PROFILING=1); nothing is installed otherwise
+if profiling.PROFILING_ENABLED:
+    profiling.install(app, engine)
+
+
+def _runtime_gauges():
+    queue = write_queue.stats()
+    generation = dispatcher.stats()
+    cache = response_cache.stats()
+    yield "brandcraft_write_queue_pending", "Rows buffered in the write-behind queue.", queue["pending"]
+    yield "brandcraft_write_queue_dropped", "Rows dropped by the write-behind overflow policy.", queue["dropped"]
+    yield "brandcraft_write_queue_failed", "Rows whose write-behind flush failed.", queue["failed"]
+    yield "brandcraft_hash_pool_pending", "Password hash jobs queued or running.", hash_pool.pending
+    yield "brandcraft_generation_in_flight", "Distinct generation calls in flight.", generation["in_flight"]
+    yield "brandcraft_generation_timeouts", "Generation calls that hit the backend timeout.", generation["timeouts"]
+    yield ("brandcraft_generation_coalescing_ratio", "Share of generation calls served by an identical call in flight.",
+           generation["coalescing_ratio"])
+    yield "brandcraft_response_cache_size", "Entries in the response cache.", cache["size"]
+    yield "brandcraft_response_cache_hit_rate", "Response cache hit rate.", cache["hit_rate"]
+    yield "brandcraft_invalidations_published", "Invalidation events published by this worker.", bus.published
+    yield "brandcraft_invalidations_applied", "Invalidation events from other workers applied here.", bus.applied
+
+
+metrics.registry.register_collector(_runtime_gauges)
+
+
 # Include routers
-app.include_router(auth_routes.router)
-app.include_router(brand_routes.router)
-app.include_router(content_routes.router)
-app.include_router(sentiment_routes.router)
-app.include_router(chat_routes.router)
-app.include_router(project_routes.router)
-app.include_router(admin_routes.router)
+for _name in ROUTERS:
+    app.include_router(importlib.import_module(f"routes.{_name}_routes").router)
 
 
 @app.get("/")
@@ -48,28 +146,67 @@ def root():
 
 
 @app.get("/health")
-def health():
-    return {"status": "healthy"}
+def health(response: Response):
+    """Readiness: the database answers and the write-behind queue has room."""
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        database = {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+    except SQLAlchemyError as e:
+        database = {"ok": False, "error": type(e).__name__}
+    queue = write_queue.stats()
+    write_behind = {"ok": queue["pending"] < write_queue.max_pending, "pending": queue["pending"],
+                    "max_pending": write_queue.max_pending}
+    ready = database["ok"] and write_behind["ok"]
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "healthy" if ready else "unhealthy",
+        "database": database,
+        "write_queue": write_behind,
+        "hash_pool": {"pending": hash_pool.pending, "queue_limit": hash_pool.queue_limit},
+        "generation": {"in_flight": dispatcher.stats()["in_flight"], "timeouts": dispatcher.timeouts},
+        "worker": {"pid": os.getpid(), "invalidation": bus.stats()},
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
 
-# Serve frontend
+# Serve frontend (precompressed, fingerprinted and held in memory; see static_assets)
 frontend_dir = os.path.join(os.path.dirname(__file__), "..", "frontend")
 if os.path.exists(frontend_dir):
-    app.mount("/css", StaticFiles(directory=os.path.join(frontend_dir, "css")), name="css")
-    app.mount("/js", StaticFiles(directory=os.path.join(frontend_dir, "js")), name="js")
+    frontend = StaticAssets(frontend_dir)
+
+    @app.api_route("/css/{path:path}", methods=["GET", "HEAD"])
+    @app.api_route("/js/{path:path}", methods=["GET", "HEAD"])
+    async def serve_asset(request: Request):
+        entry = frontend.get(request.url.path)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        asset, cache_control = entry
+        return frontend.respond(asset, request, cache_control)
+
+    @app.api_route("/{page}.html", methods=["GET", "HEAD"])
+    async def serve_page(page: str, request: Request):
+        return frontend.respond(frontend.page(page), request)
+
+    @app.api_route("/app", methods=["GET", "HEAD"])
+    async def serve_index(request: Request):
+        return frontend.respond(frontend.page("index"), request)
 
-    @app.get("/{page}.html")
-    def serve_page(page: str):
-        file_path = os.path.join(frontend_dir, f"{page}.html")
-        if os.path.exists(file_path):
-            return FileResponse(file_path, media_type="text/html")
-        return FileResponse(os.path.join(frontend_dir, "index.html"), media_type="text/html")
 
-    @app.get("/app")
-    def serve_index():
-        return FileResponse(os.path.join(frontend_dir, "index.html"), media_type="text/html")
+# Starlette wraps each added middleware around the ones added before it, so this must stay the
+# last add_middleware / @app.middleware in the app: it is then outermost and request latency
+# includes every other middleware (tests/test_metrics.py checks the order)
+app.add_middleware(metrics.MetricsMiddleware)
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # WEB_CONCURRENCY > 1 runs that many worker processes (see invalidation.py for what they
+    # share); uvicorn cannot reload and run several workers at once
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=RELOAD and WORKERS == 1, workers=WORKERS)
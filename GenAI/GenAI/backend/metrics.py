@@ -0,0 +1,296 @@
+"""
+In-process metrics for BrandCraft, rendered in the Prometheus text format.
+Counters, gauges and histograms are thread-safe and keyed by label values.
+Sources wired up in main.py:
+
+- MetricsMiddleware: per-route request counts, latency histogram, in-flight gauge
+- install(engine): connection checkout (hold) time, queries by statement type
+- timed() / timed_stream(): execution time per mock_ai generator function
+- register_collector(): values computed at scrape time (queue depths, caches)
+"""
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: tuple) -> tuple:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}")
+        return tuple(str(v) for v in labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}"
+                                for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, *labels, value: float):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[-1] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = self.header()
+        for key, series in items:
+            cumulative = 0
+            for bound, hits in zip(self.buckets + (float("inf"),), series):
+                cumulative += hits
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], Iterable[Tuple[str, str, float]]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def register_collector(self, collect: Callable[[], Iterable[Tuple[str, str, float]]]):
+        """`collect()` yields (name, help, value) gauges, evaluated on every scrape."""
+        self.collectors.append(collect)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        for collect in self.collectors:
+            for name, documentation, value in collect():
+                lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge", f"{name} {_format_value(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter("brandcraft_http_requests_total", "HTTP requests by route and status.",
+                                 ("method", "route", "status"))
+http_latency = registry.histogram("brandcraft_http_request_duration_seconds", "HTTP request latency by route.",
+                                  ("method", "route"))
+http_in_flight = registry.gauge("brandcraft_http_requests_in_flight", "HTTP requests currently being served.",
+                                ("method", "route"))
+db_checkout = registry.histogram("brandcraft_db_connection_checkout_seconds",
+                                 "Time a pooled DB connection stays checked out by a session.")
+db_checked_out = registry.gauge("brandcraft_db_connections_checked_out", "DB connections currently checked out.")
+db_queries = registry.counter("brandcraft_db_queries_total", "DB statements executed, by statement type.",
+                              ("statement",))
+db_query_latency = registry.histogram("brandcraft_db_query_duration_seconds", "DB statement execution time.",
+                                      ("statement",))
+generator_latency = registry.histogram("brandcraft_generator_duration_seconds",
+                                       "mock_ai generator execution time by function.", ("function",))
+
+
+# ─── HTTP ───
+def route_label(scope: Scope) -> str:
+    """The matched route template (e.g. /api/projects/{project_id}), keeping label cardinality bounded."""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method, route = scope["method"], route_label(scope)
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc(method, route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_latency.observe(method, route, value=time.perf_counter() - start)
+            http_requests.inc(method, route, status)
+            http_in_flight.dec(method, route)
+
+
+# ─── Database ───
+def _statement_type(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+
+
+def install(engine):
+    """Register pool and cursor listeners on `engine`."""
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_conn, record, proxy):
+        record.info["metrics_checkout"] = time.perf_counter()
+        db_checked_out.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_conn, record):
+        started = record.info.pop("metrics_checkout", None)
+        if started is not None:
+            db_checkout.observe(value=time.perf_counter() - started)
+            db_checked_out.dec()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        kind = _statement_type(statement)
+        db_queries.inc(kind)
+        db_query_latency.observe(kind, value=time.perf_counter() - conn.info["metrics_query_start"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("metrics_query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+# ─── Generators ───
+def timed(fn):
+    """Decorator recording `fn`'s execution time under its function name."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            generator_latency.observe(name, value=time.perf_counter() - start)
+    return wrapper
+
+
+def timed_stream(fn):
+    """Decorator for generator functions: records the time spent producing items, not the consumer's."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        items = fn(*args, **kwargs)
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            items.close()
+            generator_latency.observe(name, value=elapsed)
+    return wrapper
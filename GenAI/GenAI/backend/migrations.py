@@ -0,0 +1,51 @@
+"""
+Lightweight schema migrations for BrandCraft.
+create_all() only creates missing tables, so databases created before an
+index was declared in models.py never get it. run_migrations() adds any
+declared index that is missing; it is safe to run on every startup.
+
+setup_database() is the one-time schema step for a deployment: tables,
+missing indexes and the dashboard counters. Production processes do not run
+it on boot (see AUTO_MIGRATE in main.py); run it once per release instead.
+
+Usage: python migrations.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from database import engine, Base
+import models  # noqa: F401  (registers tables on Base.metadata)
+import counters
+
+
+def run_migrations(bind=engine) -> list:
+    """Create declared indexes missing from existing tables; returns the names created."""
+    created = []
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=bind)
+                created.append(index.name)
+    return created
+
+
+def setup_database(bind=engine) -> list:
+    """Create tables and missing indexes, then seed the counters; returns the indexes created."""
+    Base.metadata.create_all(bind=bind)
+    created = run_migrations(bind)
+    with Session(bind) as db:
+        counters.ensure_counters(db)
+    return created
+
+
+if __name__ == "__main__":
+    created = setup_database()
+    print(f"Created {len(created)} index(es)" + (": " + ", ".join(created) if created else ""))
@@ -3,13 +3,20 @@ Mock AI response generators for BrandCraft.
 These simulate AI model outputs for demo/hackathon purposes.
 Replace with real API calls (Gemini, Stable Diffusion, HuggingFace) in production.
 """
+import itertools
 import random
+import re
 import hashlib
 import time
+import logo_renderer
+from metrics import timed, timed_stream
+from template_engine import registry as template_registry, DEFAULT_LENGTH
+from intent_router import IntentRouter
 
 
-def generate_brand_names(industry: str, keywords: str, target_audience: str, tone: str) -> list:
-    """Generate 10 mock brand names based on inputs."""
+@timed
+def generate_brand_names(industry: str, keywords: str, target_audience: str, tone: str, rng=random) -> list:
+    """Generate 10 mock brand names based on inputs. Pass a seeded random.Random as rng for repeatable output."""
     prefixes = {
         "professional": ["Apex", "Prime", "Nova", "Vertex", "Elevate", "Pinnacle", "Summit", "Zenith", "Crest", "Vanguard"],
         "playful": ["Zippy", "Sparky", "Breezy", "Fizz", "Poppy", "Quirky", "Jolly", "Wink", "Doodle", "Bubbles"],
@@ -24,41 +31,42 @@ def generate_brand_names(industry: str, keywords: str, target_audience: str, ton
 
     for i in range(10):
         if i < 3 and keyword_list:
-            kw = random.choice(keyword_list)
-            suf = random.choice(suffixes)
+            kw = rng.choice(keyword_list)
+            suf = rng.choice(suffixes)
             names.append(f"{kw}{suf}")
         elif i < 6:
             pre = base_words[i % len(base_words)]
-            suf = random.choice(suffixes)
+            suf = rng.choice(suffixes)
             names.append(f"{pre}{suf}")
         else:
-            pre = random.choice(base_words)
-            kw = random.choice(keyword_list) if keyword_list else industry.capitalize()[:4]
+            pre = rng.choice(base_words)
+            kw = rng.choice(keyword_list) if keyword_list else industry.capitalize()[:4]
             names.append(f"{pre}{kw}")
 
     return names
 
 
+@timed
 def generate_logo_urls(brand_name: str, style: str, primary_color: str, secondary_color: str) -> list:
-    """Generate mock logo placeholder URLs."""
+    """Render 4 SVG logo variations into the asset cache and return their URLs."""
     logos = []
-    clean_primary = primary_color.lstrip('#')
-    clean_secondary = secondary_color.lstrip('#')
     styles_text = {"minimal": "Minimal", "modern": "Modern", "vintage": "Vintage", "tech": "Tech"}
     style_label = styles_text.get(style, "Modern")
 
     for i in range(4):
         seed = hashlib.md5(f"{brand_name}{style}{i}".encode()).hexdigest()[:8]
-        # Using placeholder image services
+        svg = logo_renderer.render_logo_svg(brand_name, style, primary_color, secondary_color, seed)
+        digest = logo_renderer.store_asset(svg)
         logos.append({
             "id": i + 1,
-            "url": f"https://via.placeholder.com/400x400/{clean_primary}/{clean_secondary}?text={brand_name}+{style_label}+{i+1}",
+            "url": f"/api/assets/logos/{digest}.svg",
             "style": style_label,
             "label": f"{style_label} Logo Variation {i + 1}"
         })
     return logos
 
 
+@timed
 def generate_brand_identity(brand_name: str, industry: str, target_audience: str) -> dict:
     """Generate mock brand identity."""
     return {
@@ -76,56 +84,57 @@ def generate_brand_identity(brand_name: str, industry: str, target_audience: str
     }
 
 
+@timed
 def generate_content(brand_name: str, content_type: str, tone: str, keywords: str, length: str) -> dict:
-    """Generate mock marketing content."""
-    content_map = {
-        "social_post": {
-            "title": "Social Media Post",
-            "content": f"🚀 Introducing {brand_name} — the future of branding is here!\n\nTired of spending weeks on brand identity? Our AI-powered platform generates stunning logos, compelling taglines, and complete brand kits in minutes.\n\n✨ Smart. Fast. Beautiful.\n\n{'🔑 ' + keywords if keywords else ''}\n\n👉 Start your free trial today and see the difference AI can make!\n\n#Branding #AI #Innovation #{brand_name.replace(' ', '')} #StartupLife #Design",
-            "seo_keywords": [brand_name, "AI branding", "brand identity", "logo design", "startup branding"]
-        },
-        "ad_copy": {
-            "title": "Advertisement Copy",
-            "content": f"BUILD YOUR BRAND IN MINUTES, NOT MONTHS.\n\n{brand_name} uses cutting-edge AI to craft your complete brand identity — from logo to tagline to marketing content.\n\n⚡ AI-Powered Logo Generation\n⚡ Smart Brand Name Suggestions\n⚡ Auto-Generated Marketing Copy\n⚡ Real-Time Sentiment Analysis\n\nJoin 10,000+ entrepreneurs who transformed their brands with {brand_name}.\n\n[Try Free for 14 Days →]",
-            "seo_keywords": [brand_name, "automated branding", "AI design", "brand builder"]
-        },
-        "blog": {
-            "title": f"How {brand_name} is Revolutionizing Brand Building with AI",
-            "content": f"# How {brand_name} is Revolutionizing Brand Building with AI\n\nIn today's fast-paced digital landscape, building a memorable brand is more crucial — and challenging — than ever. Enter {brand_name}, an AI-powered branding automation platform that's changing the game.\n\n## The Old Way vs. The {brand_name} Way\n\nTraditional branding takes weeks of agency consultations, design iterations, and strategy sessions. With {brand_name}, entrepreneurs and startups can generate professional brand identities in minutes.\n\n## Key Features\n\n### 1. AI Brand Name Generator\nInput your industry, keywords, and target audience — get 10 creative, market-ready brand names instantly.\n\n### 2. Logo Generation\nOur AI creates multiple logo variations in styles ranging from minimal to modern, all customizable to your brand palette.\n\n### 3. Content Automation\nFrom social media posts to full blog articles, {brand_name} generates on-brand marketing content tailored to your audience.\n\n### 4. Sentiment Analysis\nUnderstand how your audience perceives your brand with real-time sentiment analysis and actionable AI suggestions.\n\n## The Bottom Line\n\n{brand_name} isn't just a tool — it's your AI branding partner. Whether you're launching a startup or refreshing an established brand, our platform delivers professional results at a fraction of the traditional cost.\n\n*Ready to transform your brand? Get started with {brand_name} today.*",
-            "seo_keywords": [brand_name, "AI branding", "brand building", "startup tools", "design automation"]
-        },
-        "email": {
-            "title": "Email Marketing Template",
-            "content": f"Subject: Your Brand Deserves Better — Meet {brand_name} 🎨\n\nHi [First Name],\n\nWe know building a brand from scratch is overwhelming. That's why we created {brand_name} — your AI-powered branding companion.\n\nHere's what you get:\n\n✅ Instant brand name generation\n✅ AI-designed logos in 4 unique styles\n✅ Complete brand identity kit (mission, vision, values)\n✅ Marketing content generation\n✅ Real-time sentiment analysis\n\n🎁 Special Offer: Start your free 14-day trial and get your first brand kit free.\n\n[Start Building Your Brand →]\n\nBest,\nThe {brand_name} Team\n\nP.S. Over 10,000 brands were created with {brand_name} last month alone. Don't miss out!",
-            "seo_keywords": [brand_name, "email marketing", "branding", "free trial"]
-        }
+    """Generate mock marketing content from the precompiled template registry."""
+    context = {
+        "brand_name": brand_name,
+        "brand_tag": brand_name.replace(" ", ""),
+        "keywords": keywords or "",
+        "tone": tone,
     }
+    return template_registry.render(content_type, context, length or DEFAULT_LENGTH)
 
-    result = content_map.get(content_type, content_map["social_post"])
-    return result
 
+@timed
+def generate_content_bulk(brand_names: list, content_type: str, tones: list, keywords: str, length: str) -> list:
+    """Render one content type for every (brand_name, tone) pair."""
+    return [
+        {"brand_name": brand_name, "tone": tone, **generate_content(brand_name, content_type, tone, keywords, length)}
+        for brand_name in brand_names
+        for tone in tones
+    ]
 
-def analyze_sentiment(text: str) -> dict:
+
+POSITIVE_WORDS = frozenset({"great", "love", "excellent", "amazing", "wonderful", "fantastic", "good", "best",
+                            "happy", "awesome", "beautiful", "outstanding", "brilliant", "perfect", "superb"})
+NEGATIVE_WORDS = frozenset({"bad", "terrible", "awful", "worst", "hate", "poor", "horrible", "disgusting",
+                            "disappointing", "frustrated", "angry", "ugly", "broken", "useless", "pathetic"})
+
+
+@timed
+def analyze_sentiment(text: str, rng=random) -> dict:
     """Mock sentiment analysis."""
     words = text.lower().split()
-    positive_words = {"great", "love", "excellent", "amazing", "wonderful", "fantastic", "good", "best",
-                      "happy", "awesome", "beautiful", "outstanding", "brilliant", "perfect", "superb"}
-    negative_words = {"bad", "terrible", "awful", "worst", "hate", "poor", "horrible", "disgusting",
-                      "disappointing", "frustrated", "angry", "ugly", "broken", "useless", "pathetic"}
+    pos_count = sum(1 for w in words if w in POSITIVE_WORDS)
+    neg_count = sum(1 for w in words if w in NEGATIVE_WORDS)
+    return sentiment_from_counts(pos_count, neg_count, rng)
+
 
-    pos_count = sum(1 for w in words if w in positive_words)
-    neg_count = sum(1 for w in words if w in negative_words)
-    total = max(pos_count + neg_count, 1)
+def sentiment_from_counts(pos_count: int, neg_count: int, rng=random) -> dict:
+    """Build a mock sentiment result from positive/negative lexicon hit counts.
 
+    Not timed: it runs once per row in batches, which are timed as a whole by sentiment_batch.
+    """
     if pos_count > neg_count:
-        positive = round(random.uniform(55, 80), 1)
-        negative = round(random.uniform(5, 15), 1)
+        positive = round(rng.uniform(55, 80), 1)
+        negative = round(rng.uniform(5, 15), 1)
     elif neg_count > pos_count:
-        positive = round(random.uniform(10, 25), 1)
-        negative = round(random.uniform(50, 75), 1)
+        positive = round(rng.uniform(10, 25), 1)
+        negative = round(rng.uniform(50, 75), 1)
     else:
-        positive = round(random.uniform(30, 45), 1)
-        negative = round(random.uniform(20, 35), 1)
+        positive = round(rng.uniform(30, 45), 1)
+        negative = round(rng.uniform(20, 35), 1)
 
     neutral = round(100 - positive - negative, 1)
     perception = round((positive * 1.0 + neutral * 0.5 + negative * 0.0) / 100 * 10, 1)
@@ -165,13 +174,18 @@ def analyze_sentiment(text: str) -> dict:
     }
 
 
-def chat_response(message: str, context: str = "") -> dict:
-    """Mock AI branding consultant chatbot."""
-    message_lower = message.lower()
+@timed
+def sentiment_batch(counts, rngs=None) -> list:
+    """Sentiment results for a batch of (positive, negative) counts; `rngs` gives one rng per item."""
+    return [sentiment_from_counts(pos, neg, rng) for (pos, neg), rng in zip(counts, rngs or itertools.repeat(random))]
+
 
-    if any(w in message_lower for w in ["swot", "strength", "weakness", "opportunity", "threat"]):
-        return {
-            "response": """**SWOT Analysis for Your Brand:**
+# ─── Chatbot intents ───
+# Registered in priority order: when two intents score the same, the earlier one wins.
+chat_intents = IntentRouter()
+
+chat_intents.register("swot", ["swot", "strength", "weakness", "opportunity", "threat"], {
+    "response": """**SWOT Analysis for Your Brand:**
 
 **Strengths:**
 • Innovative AI-powered approach sets you apart from competitors
@@ -194,16 +208,15 @@ def chat_response(message: str, context: str = "") -> dict:
 • Economic downturns affecting startup funding and spending
 
 I recommend focusing on your strengths while addressing weaknesses through targeted content marketing and customer education campaigns.""",
-            "suggestions": [
-                "Run a competitive analysis",
-                "Define your unique value proposition",
-                "Create a customer feedback loop"
-            ]
-        }
+    "suggestions": [
+        "Run a competitive analysis",
+        "Define your unique value proposition",
+        "Create a customer feedback loop"
+    ]
+})
 
-    elif any(w in message_lower for w in ["position", "market", "compete", "competitor"]):
-        return {
-            "response": """**Market Positioning Strategy:**
+chat_intents.register("positioning", ["position", "market", "compete", "competitor"], {
+    "response": """**Market Positioning Strategy:**
 
 To effectively position your brand, I recommend the **"Innovative Disruptor"** positioning strategy:
 
@@ -217,16 +230,15 @@ To effectively position your brand, I recommend the **"Innovative Disruptor"** p
 - For investors: "We're automating a $50B branding industry"
 - For customers: "Your brand, perfected by AI, in under 10 minutes"
 - For partners: "The future of branding workflow automation" """,
-            "suggestions": [
-                "Analyze top 5 competitors",
-                "Create a positioning map",
-                "Define target customer personas"
-            ]
-        }
+    "suggestions": [
+        "Analyze top 5 competitors",
+        "Create a positioning map",
+        "Define target customer personas"
+    ]
+})
 
-    elif any(w in message_lower for w in ["campaign", "marketing", "promote", "advertise"]):
-        return {
-            "response": """**Marketing Campaign Ideas:**
+chat_intents.register("campaign", ["campaign", "marketing", "promote", "advertise"], {
+    "response": """**Marketing Campaign Ideas:**
 
 🎯 **Campaign 1: "Brand in a Minute" Challenge**
 - Social media campaign showing real-time brand creation
@@ -254,16 +266,15 @@ To effectively position your brand, I recommend the **"Innovative Disruptor"** p
 - Partnerships: 20%
 - Paid Ads: 15%
 - PR: 5%""",
-            "suggestions": [
-                "Start with Campaign 1 for viral potential",
-                "Set up tracking for each campaign",
-                "A/B test ad creatives"
-            ]
-        }
+    "suggestions": [
+        "Start with Campaign 1 for viral potential",
+        "Set up tracking for each campaign",
+        "A/B test ad creatives"
+    ]
+})
 
-    else:
-        return {
-            "response": f"""Thanks for your question! As your AI Branding Consultant, here's my advice:
+DEFAULT_CHAT_RESPONSE = {
+    "response": """Thanks for your question! As your AI Branding Consultant, here's my advice:
 
 **Brand Strategy Insights:**
 
@@ -281,10 +292,27 @@ To effectively position your brand, I recommend the **"Innovative Disruptor"** p
 - ✅ Use this consultant for ongoing strategic advice
 
 *What specific aspect of branding would you like to dive deeper into?*""",
-            "suggestions": [
-                "Tell me about your brand's target audience",
-                "Generate a SWOT analysis",
-                "Get marketing campaign ideas",
-                "Discuss brand positioning"
-            ]
-        }
+    "suggestions": [
+        "Tell me about your brand's target audience",
+        "Generate a SWOT analysis",
+        "Get marketing campaign ideas",
+        "Discuss brand positioning"
+    ]
+}
+
+
+@timed
+def chat_response(message: str, context: str = "") -> dict:
+    """Mock AI branding consultant chatbot."""
+    intent = chat_intents.route(message, context)
+    return dict(intent.payload if intent else DEFAULT_CHAT_RESPONSE)
+
+
+@timed_stream
+def chat_response_stream(message: str, context: str = ""):
+    """Mock streaming chatbot: yields the response word by word as it is produced, then the rest."""
+    intent = chat_intents.route(message, context)
+    result = intent.payload if intent else DEFAULT_CHAT_RESPONSE
+    for match in re.finditer(r"\s*\S+\s*", result["response"]):
+        yield {"delta": match.group()}
+    yield {key: value for key, value in result.items() if key != "response"}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Float, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -6,6 +6,8 @@ from database import Base
 
 class User(Base):
     __tablename__ = "users"
+    # Keyset order of the admin user list
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
@@ -21,6 +23,7 @@ class User(Base):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (Index("ix_projects_user_id_created_at", "user_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
@@ -38,6 +41,10 @@ class Project(Base):
 
 class BrandAsset(Base):
     __tablename__ = "brand_assets"
+    __table_args__ = (
+        Index("ix_brand_assets_project_id_asset_type", "project_id", "asset_type"),
+        Index("ix_brand_assets_project_id_created_at_id", "project_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
@@ -50,6 +57,7 @@ class BrandAsset(Base):
 
 class GeneratedContent(Base):
     __tablename__ = "generated_content"
+    __table_args__ = (Index("ix_generated_content_project_id_created_at", "project_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
@@ -63,6 +71,7 @@ class GeneratedContent(Base):
 
 class SentimentReport(Base):
     __tablename__ = "sentiment_reports"
+    __table_args__ = (Index("ix_sentiment_reports_project_id_created_at", "project_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
@@ -79,6 +88,7 @@ class SentimentReport(Base):
 
 class ChatHistory(Base):
     __tablename__ = "chat_history"
+    __table_args__ = (Index("ix_chat_history_user_id_created_at", "user_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -97,3 +107,29 @@ class AdminLog(Base):
     details = Column(Text)
     admin_id = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+
+    name = Column(String(50), primary_key=True)  # table whose rows are counted
+    value = Column(Integer, nullable=False, default=0)
+
+
+class ApiCallCount(Base):
+    __tablename__ = "api_call_counts"
+
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class InvalidationEvent(Base):
+    __tablename__ = "invalidation_events"
+    # AUTOINCREMENT: ids never go backwards, even after every row has been pruned
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(50), nullable=False)  # user / project / brand_asset
+    key = Column(String(255), nullable=False)
+    origin = Column(String(32), nullable=False)  # publishing process, which skips its own events
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
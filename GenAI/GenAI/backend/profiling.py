@@ -0,0 +1,283 @@
+"""
+Opt-in request profiling for BrandCraft.
+Nothing here is installed unless PROFILING=1, so a normal deployment pays
+nothing. When enabled, a request is profiled if it carries
+`X-Profile: <PROFILE_TOKEN>` (the header is ignored while no token is set) or
+falls inside PROFILE_SAMPLE_RATE, and fewer than PROFILE_MAX_CONCURRENT
+requests are already being profiled. A profiled request gets:
+
+- a statistical stack sampler (every PROFILE_INTERVAL seconds) over the event
+  loop thread plus any worker thread seen running the request's SQL, auth or
+  bcrypt work; stacks are kept in collapsed form ("a;b;c count") for
+  flamegraph.pl / speedscope
+- every SQL statement with its duration, from engine cursor events
+- spans for auth.get_current_user and bcrypt hash/verify calls
+
+The response carries X-Profile-Id; admins fetch results from /api/admin/profiles.
+"""
+import contextvars
+import functools
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILING_ENABLED = os.getenv("PROFILING", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # fraction of requests, 0..1
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))  # seconds between stack samples
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))  # most recent profiles kept in memory
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")  # shared secret clients send in X-Profile
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "2"))  # each profile runs a sampler thread
+PROFILE_HEADER = "x-profile"
+MAX_STACK_DEPTH = 128
+MAX_STATEMENT_LENGTH = 500
+
+_current: contextvars.ContextVar[Optional["Profile"]] = contextvars.ContextVar("profile", default=None)
+_ids = itertools.count(1)
+
+
+class Profile:
+    def __init__(self, method: str, path: str):
+        self.id = next(_ids)
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.status = None
+        self.stacks: Counter = Counter()
+        self.sql: List[dict] = []
+        self.spans: List[dict] = []
+        self.threads: Dict[int, int] = {threading.get_ident(): 1}  # ident -> active registrations
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    # ─── threads ───
+    def enter_thread(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self.threads[ident] = self.threads.get(ident, 0) + 1
+
+    def exit_thread(self):
+        ident = threading.get_ident()
+        with self._lock:
+            if self.threads.get(ident, 0) <= 1:
+                self.threads.pop(ident, None)
+            else:
+                self.threads[ident] -= 1
+
+    # ─── sampling ───
+    def start_sampler(self, interval: float = PROFILE_INTERVAL):
+        threading.Thread(target=self._sample, args=(interval,), name=f"profiler-{self.id}", daemon=True).start()
+
+    def stop(self):
+        self._done.set()
+
+    def _sample(self, interval: float):
+        while not self._done.wait(interval):
+            frames = sys._current_frames()
+            with self._lock:
+                idents = list(self.threads)
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[_collapse(frame)] += 1
+
+    # ─── spans ───
+    def add_span(self, name: str, duration: float):
+        with self._lock:
+            self.spans.append({"name": name, "duration_ms": round(duration * 1000, 3)})
+
+    def add_sql(self, statement: str, duration: float):
+        with self._lock:
+            self.sql.append({"statement": " ".join(statement.split())[:MAX_STATEMENT_LENGTH],
+                             "duration_ms": round(duration * 1000, 3)})
+
+    # ─── output ───
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "samples": sum(self.stacks.values()),
+            "sql_count": len(self.sql),
+            "sql_ms": round(sum(q["duration_ms"] for q in self.sql), 3),
+            "span_ms": {name: round(sum(s["duration_ms"] for s in self.spans if s["name"] == name), 3)
+                        for name in dict.fromkeys(s["name"] for s in self.spans)},
+        }
+
+    def detail(self) -> dict:
+        return {**self.summary(), "sql": self.sql, "spans": self.spans}
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class ProfileStore:
+    def __init__(self, keep: int = PROFILE_KEEP):
+        self._profiles = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def list(self) -> List[Profile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+
+store = ProfileStore()
+
+
+def should_profile(scope: Scope) -> bool:
+    if PROFILE_TOKEN:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode() and hmac.compare_digest(value, PROFILE_TOKEN.encode()):
+                return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, max_concurrent: int = PROFILE_MAX_CONCURRENT):
+        self.app = app
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self.skipped = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not should_profile(scope):
+            return await self.app(scope, receive, send)
+        if self.active >= self.max_concurrent:
+            # Over the cap the request is served, just not profiled
+            self.skipped += 1
+            return await self.app(scope, receive, send)
+        self.active += 1
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self.active -= 1
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send):
+        profile = Profile(scope["method"], scope["path"])
+        token = _current.set(profile)
+
+        async def send_with_id(message: Message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                MutableHeaders(scope=message)["X-Profile-Id"] = str(profile.id)
+            await send(message)
+
+        profile.start_sampler()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.duration = time.perf_counter() - start
+            profile.stop()
+            _current.reset(token)
+            store.add(profile)
+
+
+# ─── hooks (installed only when profiling is enabled) ───
+def _install_sql(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        if profile is not None:
+            # Worker threads doing the request's SQL are sampled for the rest of the request
+            if threading.get_ident() not in profile.threads:
+                profile.enter_thread()
+            conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        starts = conn.info.get("profile_query_start")
+        if profile is not None and starts:
+            profile.add_sql(statement, time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("profile_query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+def _span(name: str, fn):
+    """Wrap a sync callable so its time (and thread) is attributed to the active profile."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        profile.enter_thread()
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.add_span(name, time.perf_counter() - start)
+            profile.exit_thread()
+    return wrapper
+
+
+def _install_hash_pool(hash_pool):
+    run = hash_pool.run
+
+    async def profiled_run(fn, *args):
+        profile = _current.get()
+        if profile is None:
+            return await run(fn, *args)
+        # The executor does not carry context variables, so bind the profile explicitly
+        name = f"bcrypt.{fn.__name__}"
+
+        def call(*call_args):
+            token = _current.set(profile)
+            try:
+                return _span(name, fn)(*call_args)
+            finally:
+                _current.reset(token)
+
+        start = time.perf_counter()
+        try:
+            return await run(call, *args)
+        finally:
+            profile.add_span(f"{name} (incl. queue wait)", time.perf_counter() - start)
+
+    hash_pool.run = profiled_run
+
+
+def install(app, engine):
+    """Enable profiling on `app`: middleware, SQL listeners, auth and bcrypt spans."""
+    import auth
+
+    app.add_middleware(ProfilingMiddleware)
+    _install_sql(engine)
+    _install_hash_pool(auth.hash_pool)
+    # Routes captured get_current_user at import; an override reaches every Depends on it
+    app.dependency_overrides[auth.get_current_user] = _span("auth.get_current_user", auth.get_current_user)
@@ -0,0 +1,208 @@
+"""
+Token-bucket rate limiting for the BrandCraft API.
+Each quota name maps to a bucket of `capacity` tokens refilled at `rate`
+tokens per second; a request spends one token from the bucket for
+(quota, user id) or, on the unauthenticated auth routes, (quota, client IP).
+Quotas live in QUOTAS below and can be overridden with RATE_LIMITS, e.g.
+RATE_LIMITS="chat=60/minute,login=20/minute".
+
+Buckets are kept in a RateLimitStore. MemoryStore holds one small entry per
+active key and evicts keys idle long enough to have refilled completely
+(indistinguishable from a fresh bucket). A shared backend (Redis, etc.)
+implements the same `take` method.
+
+Responses carry RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset;
+rejected requests get 429 with Retry-After. Handlers that build their own
+Response (streams) carry them over with copy_headers.
+
+Behind a reverse proxy, list its addresses in TRUSTED_PROXIES (IPs or CIDRs,
+comma-separated) so limit_ip keys on the X-Forwarded-For client instead of
+the proxy; the header is ignored from any other peer.
+"""
+import ipaddress
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+from auth import get_current_user
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+TRUSTED_PROXIES = [ipaddress.ip_network(p.strip()) for p in os.getenv("TRUSTED_PROXIES", "").split(",") if p.strip()]
+HEADERS = ("RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset")
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Quota:
+    capacity: int  # burst size
+    period: float  # seconds to refill the full capacity
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, spec: str) -> "Quota":
+        """Parse "30/minute" (also second, hour, day)."""
+        count, _, period = spec.strip().partition("/")
+        try:
+            return cls(int(count), _PERIODS[period.strip()])
+        except (ValueError, KeyError):
+            raise ValueError(f"Invalid rate limit '{spec}', expected e.g. '30/minute'")
+
+
+# ─── Quotas (the one place to tune them) ───
+QUOTAS: Dict[str, Quota] = {
+    "login": Quota.parse("10/minute"),
+    "register": Quota.parse("5/minute"),
+    "chat": Quota.parse("30/minute"),
+    "content": Quota.parse("30/minute"),
+    "bulk": Quota.parse("5/minute"),
+    "brand": Quota.parse("60/minute"),
+    "sentiment": Quota.parse("120/minute"),
+}
+for _override in filter(None, os.getenv("RATE_LIMITS", "").split(",")):
+    _name, _, _spec = _override.partition("=")
+    QUOTAS[_name.strip()] = Quota.parse(_spec)
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the bucket is full again
+    retry_after: float = 0.0  # seconds until one token is available (when rejected)
+
+
+class RateLimitStore:
+    """Interface for bucket storage; implementations must make `take` atomic per key."""
+
+    def take(self, key: str, quota: Quota, cost: int = 1) -> Decision:
+        raise NotImplementedError
+
+
+class MemoryStore(RateLimitStore):
+    """In-process buckets: key -> [tokens, last refill time], ordered by last use."""
+
+    def __init__(self):
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._idle_after: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, quota: Quota, cost: int = 1) -> Decision:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(quota.capacity), now]
+            else:
+                bucket[0] = min(quota.capacity, bucket[0] + (now - bucket[1]) * quota.rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+            self._idle_after[key] = quota.period
+            allowed = bucket[0] >= cost
+            if allowed:
+                bucket[0] -= cost
+            tokens = bucket[0]
+        return Decision(
+            allowed=allowed,
+            limit=quota.capacity,
+            remaining=int(tokens),
+            reset_after=(quota.capacity - tokens) / quota.rate,
+            retry_after=0.0 if allowed else (cost - tokens) / quota.rate,
+        )
+
+    def _evict_idle(self, now: float):
+        # Least recently used first; a key idle for a full refill period holds a full bucket
+        while self._buckets:
+            key, (_, last) = next(iter(self._buckets.items()))
+            if now - last < self._idle_after[key]:
+                break
+            del self._buckets[key]
+            del self._idle_after[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+store: RateLimitStore = MemoryStore()
+
+
+def check(quota_name: str, identity, response: Optional[Response] = None) -> Decision:
+    """Spend one token for `identity` under `quota_name`; raise 429 when the bucket is empty."""
+    quota = QUOTAS[quota_name]
+    decision = store.take(f"{quota_name}:{identity}", quota)
+    headers = {
+        "RateLimit-Limit": str(decision.limit),
+        "RateLimit-Remaining": str(decision.remaining),
+        "RateLimit-Reset": str(math.ceil(decision.reset_after)),
+    }
+    if not decision.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(decision.retry_after)))
+        raise HTTPException(status_code=429, detail="Rate limit exceeded, please retry later", headers=headers)
+    if response is not None:
+        response.headers.update(headers)
+    return decision
+
+
+def copy_headers(source: Response, target: Response) -> Response:
+    """Carry the rate-limit headers set on the injected `source` over to a Response the handler built."""
+    for name in HEADERS:
+        if name in source.headers:
+            target.headers[name] = source.headers[name]
+    return target
+
+
+def _trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(request: Request) -> str:
+    """The peer address, or behind TRUSTED_PROXIES the nearest X-Forwarded-For hop they did not add."""
+    host = request.client.host if request.client else "unknown"
+    if not TRUSTED_PROXIES or not _trusted(host):
+        return host
+    hops = [hop.strip() for hop in ",".join(request.headers.getlist("x-forwarded-for")).split(",") if hop.strip()]
+    for hop in reversed(hops):
+        host = hop
+        if not _trusted(hop):
+            break
+    return host
+
+
+def _require_quota(quota_name: str):
+    # Fail at import time on a typo rather than on the first request
+    if quota_name not in QUOTAS:
+        raise KeyError(f"No rate limit quota named '{quota_name}'")
+
+
+def limit_user(quota_name: str):
+    """Route dependency: rate limit by authenticated user id."""
+    _require_quota(quota_name)
+
+    async def dependency(response: Response, current_user=Depends(get_current_user)):
+        if RATE_LIMIT_ENABLED:
+            check(quota_name, current_user.id, response)
+    return dependency
+
+
+def limit_ip(quota_name: str):
+    """Route dependency: rate limit by client address (for unauthenticated routes)."""
+    _require_quota(quota_name)
+
+    async def dependency(request: Request, response: Response):
+        if RATE_LIMIT_ENABLED:
+            check(quota_name, client_ip(request), response)
+    return dependency
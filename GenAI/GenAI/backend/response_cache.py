@@ -0,0 +1,92 @@
+"""
+Response cache between the routes and the generator backend.
+Request fields are normalized (trimmed, whitespace-collapsed) before both
+keying and generation, so trivially different inputs share one entry and a
+cached answer is exactly what the generator returns for that key.
+
+Pure generators are always cached. Random-based generators (brand names,
+sentiment) are only cached when seeded determinism is on: the generator then
+gets a seed derived from the request key, so a cached answer is the same
+answer a fresh call would give.
+
+Concurrent identical misses are not coalesced here: `generate` is the
+generation dispatcher, the one single-flight layer, so they share its call
+(and its coalescing stats) and each stores the same result.
+
+Clients can skip the cache for one request with `Cache-Control: no-cache`.
+"""
+import hashlib
+import json
+import os
+import re
+
+from fastapi import Request
+from cache import TTLCache
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))  # seconds
+DETERMINISTIC_GENERATION = os.getenv("DETERMINISTIC_GENERATION", "0") == "1"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(value):
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value.strip())
+    return value
+
+
+def make_key(name: str, fields: dict) -> str:
+    return f"{name}:{json.dumps(fields, sort_keys=True, default=str)}"
+
+
+def seed_for(key: str) -> int:
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "big")
+
+
+class ResponseCache:
+    """Caches generator results; `store` is any object with get/set/stats (TTLCache by default)."""
+
+    def __init__(self, store=None, deterministic: bool = DETERMINISTIC_GENERATION):
+        self.store = store or TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+        self.deterministic = deterministic
+
+    async def get_or_generate(self, name: str, generate, fields: dict, bypass: bool = False):
+        """Return await generate(**fields), served from the cache when possible."""
+        fields = {k: normalize(v) for k, v in fields.items()}
+        key = make_key(name, fields)
+        if bypass:
+            return await generate(**fields)
+        cached = self.store.get(key)
+        if cached is not None:
+            return cached
+        return await self._generate_and_store(key, generate(**fields))
+
+    async def get_or_generate_random(self, name: str, generate, fields: dict, bypass: bool = False):
+        """Like get_or_generate, for generators taking a `seed`; cached only in deterministic mode."""
+        fields = {k: normalize(v) for k, v in fields.items()}
+        if not self.deterministic:
+            return await generate(**fields)
+        key = make_key(name, fields)
+        if bypass:
+            return await generate(**fields, seed=seed_for(key))
+        cached = self.store.get(key)
+        if cached is not None:
+            return cached
+        return await self._generate_and_store(key, generate(**fields, seed=seed_for(key)))
+
+    async def _generate_and_store(self, key: str, pending):
+        result = await pending
+        self.store.set(key, result)
+        return result
+
+    def stats(self) -> dict:
+        return {**self.store.stats(), "deterministic": self.deterministic}
+
+
+def cache_bypass(request: Request) -> bool:
+    """Dependency: True when the client asked to skip cached responses."""
+    return "no-cache" in request.headers.get("cache-control", "").lower()
+
+
+response_cache = ResponseCache()
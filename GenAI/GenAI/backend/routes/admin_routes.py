@@ -1,17 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from database import get_db
-from auth import require_admin
-from typing import List
+from auth import require_admin, auth_cache_stats
+from invalidation import bus
+from typing import List, Optional
+from pagination import keyset_page, parse_fields, MAX_LIMIT
+from response_cache import response_cache
+from generation import dispatcher
+from conversation import conversations
+import counters
+import profiling
 from models import User, Project, BrandAsset, GeneratedContent, SentimentReport, ChatHistory, AdminLog
 import schemas
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
+USER_LIST_FIELDS = ["id", "username", "email", "role", "is_active", "created_at"]
+
 
 @router.get("/users")
-def list_users(admin: User = Depends(require_admin), db: Session = Depends(get_db)):
-    users = db.query(User).all()
+def list_users(response: Response, limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+               cursor: Optional[str] = None, fields: Optional[str] = None,
+               admin: User = Depends(require_admin), db: Session = Depends(get_db)):
+    selected = parse_fields(fields, USER_LIST_FIELDS)
+    users = keyset_page(db, User, [], response, limit, cursor, selected)
+    if selected is not None:
+        return users
     return [{
         "id": u.id,
         "username": u.username,
@@ -24,24 +39,49 @@ def list_users(admin: User = Depends(require_admin), db: Session = Depends(get_d
 
 @router.get("/stats")
 def get_stats(admin: User = Depends(require_admin), db: Session = Depends(get_db)):
-    total_users = db.query(User).count()
-    total_projects = db.query(Project).count()
-    total_content = db.query(GeneratedContent).count()
-    total_sentiments = db.query(SentimentReport).count()
-    total_chats = db.query(ChatHistory).count()
-    total_assets = db.query(BrandAsset).count()
+    # Materialized counters, maintained on every insert/delete (see counters.py)
+    counts = counters.get_counts(db)
 
     return {
-        "total_users": total_users,
-        "total_projects": total_projects,
-        "total_generated_content": total_content,
-        "total_sentiment_reports": total_sentiments,
-        "total_chat_messages": total_chats,
-        "total_brand_assets": total_assets,
-        "api_calls_today": total_content + total_sentiments + total_chats + 42  # mock
+        "total_users": counts.get(User.__tablename__, 0),
+        "total_projects": counts.get(Project.__tablename__, 0),
+        "total_generated_content": counts.get(GeneratedContent.__tablename__, 0),
+        "total_sentiment_reports": counts.get(SentimentReport.__tablename__, 0),
+        "total_chat_messages": counts.get(ChatHistory.__tablename__, 0),
+        "total_brand_assets": counts.get(BrandAsset.__tablename__, 0),
+        "api_calls_today": counters.api_calls.today(db)
     }
 
 
+@router.get("/cache-stats")
+def get_cache_stats(admin: User = Depends(require_admin)):
+    return {"auth": auth_cache_stats(), "responses": response_cache.stats(), "generation": dispatcher.stats(),
+            "conversations": conversations.stats()}
+
+
+@router.get("/profiles")
+def list_profiles(admin: User = Depends(require_admin)):
+    return {"enabled": profiling.PROFILING_ENABLED, "profiles": [p.summary() for p in profiling.store.list()]}
+
+
+def _get_profile(profile_id: int):
+    profile = profiling.store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: int, admin: User = Depends(require_admin)):
+    return _get_profile(profile_id).detail()
+
+
+@router.get("/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+def get_profile_collapsed(profile_id: int, admin: User = Depends(require_admin)):
+    """Collapsed stacks, one "frame;frame;frame count" line each, for flamegraph.pl or speedscope."""
+    return _get_profile(profile_id).collapsed()
+
+
 @router.get("/logs")
 def get_logs(admin: User = Depends(require_admin), db: Session = Depends(get_db)):
     logs = db.query(AdminLog).order_by(AdminLog.created_at.desc()).limit(50).all()
@@ -60,6 +100,7 @@ def suspend_user(user_id: int, admin: User = Depends(require_admin), db: Session
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.is_active = not user.is_active
+    bus.publish(db, "user", user_id)
     db.commit()
 
     log = AdminLog(action="user_toggled", details=f"User {user.username} active={user.is_active}", admin_id=admin.id)
@@ -81,5 +122,6 @@ def delete_user(user_id: int, admin: User = Depends(require_admin), db: Session
     db.add(log)
 
     db.delete(user)
+    bus.publish(db, "user", user_id)
     db.commit()
     return {"message": "User deleted"}
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+import os
+import logo_renderer
+
+router = APIRouter(prefix="/api", tags=["Assets"])
+
+# Asset names are content hashes, so a URL's bytes never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/assets/logos/{digest}.svg")
+def get_logo(digest: str, request: Request):
+    if not logo_renderer.DIGEST_PATTERN.match(digest):
+        raise HTTPException(status_code=404, detail="Asset not found")
+    # A digest can't be re-rendered, so a missing file answers 404 even to a revalidation
+    path = logo_renderer.asset_path(digest)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Asset not found")
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/svg+xml", headers=headers)
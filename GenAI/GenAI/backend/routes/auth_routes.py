@@ -1,51 +1,83 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from database import get_db
-from auth import hash_password, verify_password, create_access_token, get_current_user
+from auth import (hash_password_pooled, verify_password_pooled, needs_rehash, create_access_token,
+                  get_current_user)
 import models
 import schemas
+from ratelimit import limit_ip
+from invalidation import bus
 
 router = APIRouter(prefix="/api", tags=["Authentication"])
 
 
-@router.post("/register", response_model=schemas.UserOut)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    # Check existing
+# Async handlers: bcrypt is awaited on the hash pool without holding a threadpool thread,
+# and only the short DB steps below run on the threadpool
+@router.post("/register", response_model=schemas.UserOut, dependencies=[Depends(limit_ip("register"))])
+async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    await run_in_threadpool(_check_available, db, user)
+    hashed_password = await hash_password_pooled(user.password)
+    return await run_in_threadpool(_create_user, db, user, hashed_password)
+
+
+def _check_available(db: Session, user: schemas.UserCreate):
     if db.query(models.User).filter(models.User.email == user.email).first():
         raise HTTPException(status_code=400, detail="Email already registered")
     if db.query(models.User).filter(models.User.username == user.username).first():
         raise HTTPException(status_code=400, detail="Username already taken")
 
+
+def _create_user(db: Session, user: schemas.UserCreate, hashed_password: str) -> schemas.UserOut:
     db_user = models.User(
         username=user.username,
         email=user.email,
-        hashed_password=hash_password(user.password),
+        hashed_password=hashed_password,
         role="user"
     )
     db.add(db_user)
+    db.flush()
+    # SQLite may reuse the id of a deleted user, so drop any stale snapshot (in every worker)
+    # in the same transaction as the insert
+    bus.publish(db, "user", db_user.id)
     db.commit()
     db.refresh(db_user)
+    out = schemas.UserOut.model_validate(db_user)
 
     # Log admin action
     log = models.AdminLog(action="user_registered", details=f"User {user.username} registered", admin_id=0)
     db.add(log)
     db.commit()
 
-    return db_user
+    return out
 
 
-@router.post("/login", response_model=schemas.Token)
-def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(limit_ip("login"))])
+async def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(db.query(models.User).filter(models.User.email == user.email).first)
+    if not db_user or not await verify_password_pooled(user.password, db_user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     if not db_user.is_active:
         raise HTTPException(status_code=403, detail="Account suspended")
-
     token = create_access_token(data={"sub": str(db_user.id), "role": db_user.role})
+
+    # Upgrade hashes made with an older work factor while we have the plaintext
+    if needs_rehash(db_user.hashed_password):
+        try:
+            hashed_password = await hash_password_pooled(user.password)
+        except HTTPException:
+            pass  # pool saturated; try again on a later login
+        else:
+            await run_in_threadpool(_set_password, db, db_user, hashed_password)
+
     return {"access_token": token, "token_type": "bearer"}
 
 
+def _set_password(db: Session, db_user: models.User, hashed_password: str):
+    db_user.hashed_password = hashed_password
+    db.commit()
+
+
 @router.get("/me", response_model=schemas.UserOut)
 def get_me(current_user: models.User = Depends(get_current_user)):
     return current_user
@@ -2,26 +2,36 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from database import get_db
 from auth import get_current_user
+from response_cache import response_cache, cache_bypass
+from generation import dispatcher
 import models
 import schemas
-import mock_ai
+from functools import partial
+from ratelimit import limit_user
 
 router = APIRouter(prefix="/api", tags=["Brand"])
 
 
-@router.post("/brand-names")
-def generate_brand_names(req: schemas.BrandNameRequest, current_user: models.User = Depends(get_current_user)):
-    names = mock_ai.generate_brand_names(req.industry, req.keywords, req.target_audience, req.tone)
+@router.post("/brand-names", dependencies=[Depends(limit_user("brand"))])
+async def generate_brand_names(req: schemas.BrandNameRequest, current_user: models.User = Depends(get_current_user),
+                               bypass: bool = Depends(cache_bypass)):
+    names = await response_cache.get_or_generate_random(
+        "brand_names", partial(dispatcher.submit, "brand_names"), req.model_dump(), bypass)
     return {"brand_names": names, "industry": req.industry, "tone": req.tone}
 
 
-@router.post("/logo-generate")
-def generate_logo(req: schemas.LogoRequest, current_user: models.User = Depends(get_current_user)):
-    logos = mock_ai.generate_logo_urls(req.brand_name, req.style, req.primary_color, req.secondary_color)
+@router.post("/logo-generate", dependencies=[Depends(limit_user("brand"))])
+async def generate_logo(req: schemas.LogoRequest, current_user: models.User = Depends(get_current_user),
+                        bypass: bool = Depends(cache_bypass)):
+    logos = await response_cache.get_or_generate(
+        "logos", partial(dispatcher.submit, "logos"), req.model_dump(), bypass)
     return {"logos": logos, "brand_name": req.brand_name, "style": req.style}
 
 
-@router.post("/brand-identity")
-def generate_brand_identity(req: schemas.BrandIdentityRequest, current_user: models.User = Depends(get_current_user)):
-    identity = mock_ai.generate_brand_identity(req.brand_name, req.industry, req.target_audience)
+@router.post("/brand-identity", dependencies=[Depends(limit_user("brand"))])
+async def generate_brand_identity(req: schemas.BrandIdentityRequest,
+                                  current_user: models.User = Depends(get_current_user),
+                                  bypass: bool = Depends(cache_bypass)):
+    identity = await response_cache.get_or_generate(
+        "brand_identity", partial(dispatcher.submit, "brand_identity"), req.model_dump(), bypass)
     return identity
@@ -1,26 +1,103 @@
-from fastapi import APIRouter, Depends
+import json
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 from database import get_db
 from auth import get_current_user
+from write_behind import write_queue
+from generation import dispatcher
+from conversation import conversations, Conversation
+from pagination import keyset_page, parse_fields, DEFAULT_LIMIT, MAX_LIMIT
+from json_response import orm_response
 import models
 import schemas
-import mock_ai
+from ratelimit import limit_user, copy_headers
 
 router = APIRouter(prefix="/api", tags=["Chat"])
 
+CHAT_HISTORY_LIST = TypeAdapter(List[schemas.ChatHistoryOut])
 
-@router.post("/chat")
-def chat(req: schemas.ChatRequest, current_user: models.User = Depends(get_current_user),
-         db: Session = Depends(get_db)):
-    result = mock_ai.chat_response(req.message, req.context)
 
-    # Save to chat history
-    history = models.ChatHistory(
-        user_id=current_user.id,
-        message=req.message,
-        response=result["response"]
-    )
-    db.add(history)
-    db.commit()
+def get_conversation(current_user: models.User = Depends(get_current_user),
+                     db: Session = Depends(get_db)) -> Conversation:
+    return conversations.get(db, current_user.id)
 
+
+def _context(conversation: Conversation, req: schemas.ChatRequest) -> str:
+    """Routing context: the previous user message, followed by any context the client sent."""
+    return "\n".join(part for part in (conversation.last_message(), req.context) if part)
+
+
+@router.post("/chat", dependencies=[Depends(limit_user("chat"))])
+async def chat(req: schemas.ChatRequest, current_user: models.User = Depends(get_current_user),
+               conversation: Conversation = Depends(get_conversation)):
+    result = await dispatcher.submit("chat", message=req.message, context=_context(conversation, req),
+                                     history=conversation.render())
+    await write_queue.enqueue_async(models.ChatHistory, _turn(current_user.id, req.message, result["response"]))
     return result
+
+
+@router.post("/chat/stream", dependencies=[Depends(limit_user("chat"))])
+async def chat_stream(req: schemas.ChatRequest, response: Response,
+                      current_user: models.User = Depends(get_current_user),
+                      conversation: Conversation = Depends(get_conversation)):
+    chunks = []
+    stream = dispatcher.stream("chat", message=req.message, context=_context(conversation, req),
+                               history=conversation.render())
+    # Wait for the first event before answering, so a backend timeout is still a 504
+    first = await stream.__anext__()
+
+    async def events():
+        event = first
+        try:
+            while True:
+                if "delta" in event:
+                    chunks.append(event["delta"])
+                    yield f"data: {json.dumps(event)}\n\n"
+                else:
+                    yield f"event: done\ndata: {json.dumps(event)}\n\n"
+                event = await stream.__anext__()
+        except StopAsyncIteration:
+            pass
+        except HTTPException as e:  # timed out mid-stream; the status line is already sent
+            yield f"event: error\ndata: {json.dumps({'detail': e.detail})}\n\n"
+        finally:
+            await stream.aclose()
+
+    # Chat history is saved once the stream has been fully sent
+    return copy_headers(response, StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(_save_history, current_user.id, req.message, chunks),
+    ))
+
+
+@router.get("/chat/history")
+def get_chat_history(response: Response, limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                     cursor: Optional[str] = None, fields: Optional[str] = None,
+                     current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Oldest first; turns still in the write-behind queue show up after its next flush."""
+    selected = parse_fields(fields, list(schemas.ChatHistoryOut.model_fields))
+    turns = keyset_page(db, models.ChatHistory, [models.ChatHistory.user_id == current_user.id],
+                        response, limit, cursor, selected)
+    if selected is not None:
+        return turns
+    return orm_response(CHAT_HISTORY_LIST, turns, response)
+
+
+def _turn(user_id: int, message: str, response: str) -> dict:
+    """Add a turn to the conversation buffer; returns its chat_history row for write-behind."""
+    created_at = datetime.utcnow()
+    conversations.record(user_id, message, response, created_at)
+    return {"user_id": user_id, "message": message, "response": response, "created_at": created_at}
+
+
+def _save_history(user_id: int, message: str, chunks: list):
+    # Runs as a background task, in the threadpool
+    if chunks:
+        write_queue.enqueue(models.ChatHistory, _turn(user_id, message, "".join(chunks)))
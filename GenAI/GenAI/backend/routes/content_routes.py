@@ -1,27 +1,52 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi import APIRouter, Depends, HTTPException
 from auth import get_current_user
+from response_cache import response_cache, cache_bypass
+from generation import dispatcher
+from write_behind import write_queue
 import models
 import schemas
 import mock_ai
+from functools import partial
+from ratelimit import limit_user
 
 router = APIRouter(prefix="/api", tags=["Content"])
 
+MAX_BULK_ITEMS = 500
 
-@router.post("/content-generate")
-def generate_content(req: schemas.ContentRequest, current_user: models.User = Depends(get_current_user),
-                     db: Session = Depends(get_db)):
-    content = mock_ai.generate_content(req.brand_name, req.content_type, req.tone, req.keywords, req.length)
 
-    # Save to DB
-    generated = models.GeneratedContent(
-        project_id=None,
-        content_type=req.content_type,
-        content_text=content["content"],
-        tone=req.tone
-    )
-    db.add(generated)
-    db.commit()
+@router.post("/content-generate", dependencies=[Depends(limit_user("content"))])
+async def generate_content(req: schemas.ContentRequest, current_user: models.User = Depends(get_current_user),
+                           bypass: bool = Depends(cache_bypass)):
+    content = await response_cache.get_or_generate(
+        "content", partial(dispatcher.submit, "content"), req.model_dump(), bypass)
+
+    # Save to DB (write-behind)
+    await write_queue.enqueue_async(models.GeneratedContent, {
+        "project_id": None,
+        "content_type": req.content_type,
+        "content_text": content["content"],
+        "tone": req.tone
+    })
 
     return content
+
+
+@router.post("/content-generate/bulk", dependencies=[Depends(limit_user("bulk"))])
+def generate_content_bulk(req: schemas.ContentBulkRequest, current_user: models.User = Depends(get_current_user)):
+    if not req.brand_names or not req.tones:
+        raise HTTPException(status_code=400, detail="brand_names and tones must not be empty")
+    if len(req.brand_names) * len(req.tones) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Bulk request exceeds {MAX_BULK_ITEMS} items")
+
+    items = mock_ai.generate_content_bulk(req.brand_names, req.content_type, req.tones, req.keywords, req.length)
+
+    # Save to DB (write-behind)
+    for item in items:
+        write_queue.enqueue(models.GeneratedContent, {
+            "project_id": None,
+            "content_type": req.content_type,
+            "content_text": item["content"],
+            "tone": item["tone"]
+        })
+
+    return {"items": items, "count": len(items)}
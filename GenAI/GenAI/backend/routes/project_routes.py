@@ -1,14 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, selectinload
 from database import get_db
 from auth import get_current_user
 import models
 import schemas
 from datetime import datetime
+from typing import List, Optional
+from pagination import keyset_page, parse_fields, MAX_LIMIT
+from json_response import orm_response
+from invalidation import bus
+from cache import TTLCache
+from pydantic import TypeAdapter
 import random
+import threading
 
 router = APIRouter(prefix="/api", tags=["Projects"])
 
+# Load every child collection of a project in one extra query each instead of per row
+PROJECT_DETAIL_OPTIONS = (
+    selectinload(models.Project.brand_assets),
+    selectinload(models.Project.generated_content),
+    selectinload(models.Project.sentiment_reports),
+)
+
+# List endpoints serialize rows straight to JSON bytes through these
+PROJECT_LIST = TypeAdapter(List[schemas.ProjectOut])
+BRAND_ASSET_LIST = TypeAdapter(List[schemas.BrandAssetOut])
+
+# Per-worker caches for the brand kit endpoints, kept in step across workers by the invalidation bus
+project_owners = TTLCache(maxsize=4096, ttl=300)  # project id -> owning user id
+brand_kits = TTLCache(maxsize=1024, ttl=300)  # project id -> whole brand kit as JSON bytes
+# Bumped by every invalidation; a fill whose read raced one is not cached, or it could outlive the event.
+# Handlers run on threadpool and bus threads, so the increment is locked (a lost one would hide a race)
+_invalidations = 0
+_invalidations_lock = threading.Lock()
+
+
+def _bump_invalidations():
+    global _invalidations
+    with _invalidations_lock:
+        _invalidations += 1
+
+
+def _forget_project(key: str):
+    _bump_invalidations()
+    project_owners.delete(int(key))
+    brand_kits.delete(int(key))
+
+
+def _forget_brand_kit(key: str):
+    _bump_invalidations()
+    brand_kits.delete(int(key))
+
+
+bus.subscribe("project", _forget_project)
+bus.subscribe("brand_asset", _forget_brand_kit)
+
+
+def _owns_project(db: Session, project_id: int, user_id: int) -> bool:
+    owner = project_owners.get(project_id)
+    if owner is None:
+        seen = _invalidations
+        owner = db.query(models.Project.user_id).filter(models.Project.id == project_id).scalar()
+        if owner is None:
+            return False
+        if seen == _invalidations:
+            project_owners.set(project_id, owner)
+    return owner == user_id
+
 
 @router.post("/projects", response_model=schemas.ProjectOut)
 def create_project(req: schemas.ProjectCreate, current_user: models.User = Depends(get_current_user),
@@ -26,12 +85,18 @@ def create_project(req: schemas.ProjectCreate, current_user: models.User = Depen
 
 
 @router.get("/projects")
-def list_projects(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
-    projects = db.query(models.Project).filter(models.Project.user_id == current_user.id).all()
-    return [schemas.ProjectOut.from_orm(p) for p in projects]
-
-
-@router.get("/projects/{project_id}")
+def list_projects(response: Response, limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+                  cursor: Optional[str] = None, fields: Optional[str] = None,
+                  current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+    selected = parse_fields(fields, list(schemas.ProjectOut.model_fields))
+    projects = keyset_page(db, models.Project, [models.Project.user_id == current_user.id],
+                           response, limit, cursor, selected)
+    if selected is not None:
+        return projects
+    return orm_response(PROJECT_LIST, projects, response)
+
+
+@router.get("/projects/{project_id}", response_model=schemas.ProjectOut)
 def get_project(project_id: int, current_user: models.User = Depends(get_current_user),
                 db: Session = Depends(get_db)):
     project = db.query(models.Project).filter(
@@ -39,10 +104,21 @@ def get_project(project_id: int, current_user: models.User = Depends(get_current
     ).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    return schemas.ProjectOut.from_orm(project)
+    return project
 
 
-@router.put("/projects/{project_id}")
+@router.get("/projects/{project_id}/detail", response_model=schemas.ProjectDetailOut)
+def get_project_detail(project_id: int, current_user: models.User = Depends(get_current_user),
+                       db: Session = Depends(get_db)):
+    project = db.query(models.Project).options(*PROJECT_DETAIL_OPTIONS).filter(
+        models.Project.id == project_id, models.Project.user_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
+
+@router.put("/projects/{project_id}", response_model=schemas.ProjectOut)
 def update_project(project_id: int, req: schemas.ProjectCreate,
                    current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
     project = db.query(models.Project).filter(
@@ -55,7 +131,7 @@ def update_project(project_id: int, req: schemas.ProjectCreate,
     project.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(project)
-    return schemas.ProjectOut.from_orm(project)
+    return project
 
 
 @router.delete("/projects/{project_id}")
@@ -67,38 +143,58 @@ def delete_project(project_id: int, current_user: models.User = Depends(get_curr
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     db.delete(project)
+    bus.publish(db, "project", project_id)
     db.commit()
     return {"message": "Project deleted"}
 
 
 # ─── Brand Kit ───
-@router.post("/brand-kit")
+@router.post("/brand-kit", response_model=schemas.BrandAssetOut)
 def save_brand_asset(req: schemas.BrandAssetCreate, current_user: models.User = Depends(get_current_user),
                      db: Session = Depends(get_db)):
+    if not _owns_project(db, req.project_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Project not found")
     asset = models.BrandAsset(
         project_id=req.project_id,
         asset_type=req.asset_type,
         asset_value=req.asset_value
     )
     db.add(asset)
+    bus.publish(db, "brand_asset", req.project_id)
     db.commit()
     db.refresh(asset)
-    return schemas.BrandAssetOut.from_orm(asset)
+    return asset
 
 
 @router.get("/brand-kit/{project_id}")
-def get_brand_kit(project_id: int, current_user: models.User = Depends(get_current_user),
-                  db: Session = Depends(get_db)):
-    assets = db.query(models.BrandAsset).filter(models.BrandAsset.project_id == project_id).all()
-    return [schemas.BrandAssetOut.from_orm(a) for a in assets]
+def get_brand_kit(project_id: int, response: Response, limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+                  cursor: Optional[str] = None, fields: Optional[str] = None,
+                  current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+    if not _owns_project(db, project_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    selected = parse_fields(fields, list(schemas.BrandAssetOut.model_fields))
+    whole, seen = limit is None and cursor is None and selected is None, _invalidations
+    if whole:
+        body = brand_kits.get(project_id)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+    assets = keyset_page(db, models.BrandAsset, [models.BrandAsset.project_id == project_id],
+                         response, limit, cursor, selected)
+    if selected is not None:
+        return assets
+    out = orm_response(BRAND_ASSET_LIST, assets, response)
+    if whole and seen == _invalidations:
+        brand_kits.set(project_id, out.body)
+    return out
 
 
 @router.delete("/brand-kit/{asset_id}")
 def delete_brand_asset(asset_id: int, current_user: models.User = Depends(get_current_user),
                        db: Session = Depends(get_db)):
     asset = db.query(models.BrandAsset).filter(models.BrandAsset.id == asset_id).first()
-    if not asset:
+    if not asset or not _owns_project(db, asset.project_id, current_user.id):
         raise HTTPException(status_code=404, detail="Asset not found")
     db.delete(asset)
+    bus.publish(db, "brand_asset", asset.project_id)
     db.commit()
     return {"message": "Asset deleted"}
@@ -1,30 +1,237 @@
-from fastapi import APIRouter, Depends
+import csv
+import json
+from functools import partial
+from typing import List, Optional
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, SessionLocal
 from auth import get_current_user
+from sentiment_engine import engine
+from write_behind import write_queue
+from response_cache import response_cache, cache_bypass
+from generation import dispatcher
 import models
 import schemas
-import mock_ai
+from ratelimit import limit_user, copy_headers
 
 router = APIRouter(prefix="/api", tags=["Sentiment"])
 
+MAX_BATCH_SIZE = 5000
+STREAM_FLUSH_SIZE = 500
+STREAM_MAX_LINE_BYTES = 1024 * 1024
 
-@router.post("/sentiment-analyze")
-def analyze_sentiment(req: schemas.SentimentRequest, current_user: models.User = Depends(get_current_user),
-                      db: Session = Depends(get_db)):
-    result = mock_ai.analyze_sentiment(req.text)
-
-    # Save report to DB
-    report = models.SentimentReport(
-        project_id=req.project_id,
-        input_text=req.text,
-        positive_pct=result["positive"],
-        neutral_pct=result["neutral"],
-        negative_pct=result["negative"],
-        brand_perception_score=result["brand_perception_score"],
-        suggestions="; ".join(result["suggestions"])
-    )
-    db.add(report)
-    db.commit()
+
+@router.post("/sentiment-analyze", dependencies=[Depends(limit_user("sentiment"))])
+async def analyze_sentiment(req: schemas.SentimentRequest, current_user: models.User = Depends(get_current_user),
+                            bypass: bool = Depends(cache_bypass)):
+    result = await response_cache.get_or_generate_random(
+        "sentiment", partial(dispatcher.submit, "sentiment"), {"text": req.text}, bypass)
+
+    # Save report to DB (write-behind)
+    await write_queue.enqueue_async(models.SentimentReport, {
+        "project_id": req.project_id,
+        "input_text": req.text,
+        "positive_pct": result["positive"],
+        "neutral_pct": result["neutral"],
+        "negative_pct": result["negative"],
+        "brand_perception_score": result["brand_perception_score"],
+        "suggestions": "; ".join(result["suggestions"])
+    })
 
     return result
+
+
+@router.post("/sentiment-analyze/batch", dependencies=[Depends(limit_user("bulk"))])
+def analyze_sentiment_batch(req: schemas.SentimentBatchRequest, current_user: models.User = Depends(get_current_user),
+                            db: Session = Depends(get_db)):
+    if not req.texts:
+        raise HTTPException(status_code=400, detail="No texts provided")
+    if len(req.texts) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_SIZE} texts")
+
+    results = engine.score(req.texts)
+
+    # Save all reports in a single bulk insert
+    _bulk_insert_reports(db, req.project_id, req.texts, results)
+    db.commit()
+
+    return {"results": results, "count": len(results)}
+
+
+@router.post("/sentiment-analyze/stream", dependencies=[Depends(limit_user("bulk"))])
+async def analyze_sentiment_stream(request: Request, response: Response, format: str = "ndjson",
+                                   project_id: Optional[int] = None,
+                                   current_user: models.User = Depends(get_current_user)):
+    """Score an NDJSON or CSV corpus as it is uploaded, streaming one NDJSON result per row back."""
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+    uploaded = anyio.Event()
+    return copy_headers(response, _UploadStreamingResponse(_score_stream(request, format, project_id, uploaded),
+                                                           uploaded, media_type="application/x-ndjson"))
+
+
+class _UploadStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body iterator is still reading the upload.
+
+    The stock response listens for disconnects on receive() from the start, which would steal
+    the upload chunks the iterator reads. Here the listener starts once `uploaded` is set;
+    until then request.stream() raises ClientDisconnect itself. Background tasks run as usual.
+    """
+
+    def __init__(self, content, uploaded: anyio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.uploaded = uploaded
+
+    async def __call__(self, scope, receive, send):
+        async with anyio.create_task_group() as task_group:
+
+            async def wrap(func):
+                await func()
+                task_group.cancel_scope.cancel()
+
+            task_group.start_soon(wrap, partial(self.stream_response, send))
+            await wrap(partial(self._listen_after_upload, receive))
+
+        if self.background is not None:
+            await self.background()
+
+    async def _listen_after_upload(self, receive):
+        await self.uploaded.wait()
+        await self.listen_for_disconnect(receive)
+
+
+def _bulk_insert_reports(db: Session, project_id, texts, results):
+    db.execute(insert(models.SentimentReport), [{
+        "project_id": project_id,
+        "input_text": text,
+        "positive_pct": result["positive"],
+        "neutral_pct": result["neutral"],
+        "negative_pct": result["negative"],
+        "brand_perception_score": result["brand_perception_score"],
+        "suggestions": "; ".join(result["suggestions"])
+    } for text, result in zip(texts, results)])
+
+
+async def _iter_lines(request: Request):
+    """Yield decoded lines from the request body without buffering more than one partial line."""
+    pending = b""
+    async for chunk in request.stream():
+        # Splitting the raw bytes is safe: b"\n" never occurs inside a UTF-8 multi-byte sequence
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", "replace").rstrip("\r")
+        if len(pending) > STREAM_MAX_LINE_BYTES:
+            raise ValueError(f"Line exceeds {STREAM_MAX_LINE_BYTES} bytes")
+    if pending:
+        yield pending.decode("utf-8", "replace").rstrip("\r")
+
+
+def _csv_record(lines: List[str]) -> Optional[list]:
+    """Fields of the CSV record made of `lines`, or None while a quoted field is still open."""
+    try:
+        return next(csv.reader(lines, strict=True), [])
+    except csv.Error as e:
+        if str(e) == "unexpected end of data":
+            return None
+        raise
+
+
+async def _iter_texts(request: Request, format: str):
+    """Yield (row_number, text or None, error or None) for every data row in the upload."""
+    row = 0
+    header = None
+    record = []  # lines of a CSV record whose quoted field spans lines
+    record_bytes = 0
+    async for line in _iter_lines(request):
+        if format == "csv":
+            if not record and not line.strip():
+                continue
+            record.append(line + "\n")
+            record_bytes += len(line.encode()) + 1
+            # Only a quote can close an open quoted field, so other lines need no re-parse
+            try:
+                fields = None if len(record) > 1 and '"' not in line else _csv_record(record)
+            except csv.Error as e:
+                fields, error = [], f"Malformed CSV row: {e}"
+            else:
+                error = None
+            if fields is None:
+                if record_bytes > STREAM_MAX_LINE_BYTES:
+                    raise ValueError(f"Record exceeds {STREAM_MAX_LINE_BYTES} bytes")
+                continue
+            record, record_bytes = [], 0
+            if header is None:
+                if error:
+                    raise ValueError(error)
+                header = [f.strip().lower() for f in fields]
+                if "text" not in header:
+                    raise ValueError("CSV header must include a 'text' column")
+                continue
+            row += 1
+            idx = header.index("text")
+            if error:
+                yield row, None, error
+            elif idx < len(fields):
+                yield row, fields[idx], None
+            else:
+                yield row, None, "Missing 'text' column"
+        elif line.strip():
+            row += 1
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                yield row, None, "Invalid JSON"
+                continue
+            text = item.get("text") if isinstance(item, dict) else item
+            if isinstance(text, str):
+                yield row, text, None
+            else:
+                yield row, None, "Missing 'text' field"
+    if record:
+        raise ValueError("Unterminated quoted field at end of CSV")
+
+
+async def _score_stream(request: Request, format: str, project_id, uploaded: anyio.Event):
+    # Route dependencies are torn down before a streamed body is sent, so own the session here
+    db = SessionLocal()
+    batch = []  # (row, text, error) in upload order
+
+    def score_and_save(items):
+        texts = [text for _, text, error in items if error is None]
+        results = engine.score(texts) if texts else []
+        if texts:
+            _bulk_insert_reports(db, project_id, texts, results)
+            db.commit()
+        scored = iter(results)
+        return "".join(json.dumps({"row": row, "error": error} if error else {"row": row, **next(scored)}) + "\n"
+                       for row, _, error in items)
+
+    async def flush():
+        # Scoring and the insert block (busy_timeout can hold a write for seconds): keep them off the loop
+        items = batch[:]
+        batch.clear()
+        return await run_in_threadpool(score_and_save, items)
+
+    try:
+        async for item in _iter_texts(request, format):
+            batch.append(item)
+            if len(batch) >= STREAM_FLUSH_SIZE:
+                yield await flush()
+        # The body is fully read: the response can now watch receive() for a disconnect
+        uploaded.set()
+        if batch:
+            yield await flush()
+    except ClientDisconnect:
+        return  # the client went away mid-upload; stop scoring
+    except ValueError as e:
+        if batch:
+            yield await flush()
+        yield json.dumps({"error": str(e)}) + "\n"
+    finally:
+        db.close()
@@ -79,6 +79,14 @@ class ContentRequest(BaseModel):
     content_type: str  # social_post, ad_copy, blog, email
     tone: str
     keywords: Optional[str] = ""
+    length: Optional[str] = "medium"  # short, medium, long
+
+
+class ContentBulkRequest(BaseModel):
+    brand_names: List[str]
+    content_type: str
+    tones: List[str]
+    keywords: Optional[str] = ""
     length: Optional[str] = "medium"
 
 
@@ -88,6 +96,11 @@ class SentimentRequest(BaseModel):
     project_id: Optional[int] = None
 
 
+class SentimentBatchRequest(BaseModel):
+    texts: List[str]
+    project_id: Optional[int] = None
+
+
 # ─── Chatbot ───
 class ChatRequest(BaseModel):
     message: str
@@ -99,6 +112,16 @@ class ChatResponse(BaseModel):
     suggestions: List[str] = []
 
 
+class ChatHistoryOut(BaseModel):
+    id: int
+    message: str
+    response: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 # ─── Brand Asset ───
 class BrandAssetCreate(BaseModel):
     project_id: int
@@ -115,3 +138,33 @@ class BrandAssetOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class GeneratedContentOut(BaseModel):
+    id: int
+    content_type: str
+    content_text: str
+    tone: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SentimentReportOut(BaseModel):
+    id: int
+    input_text: str
+    positive_pct: float
+    neutral_pct: float
+    negative_pct: float
+    brand_perception_score: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectDetailOut(ProjectOut):
+    brand_assets: List[BrandAssetOut] = []
+    generated_content: List[GeneratedContentOut] = []
+    sentiment_reports: List[SentimentReportOut] = []
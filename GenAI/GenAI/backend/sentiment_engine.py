@@ -0,0 +1,51 @@
+"""
+Batch sentiment scoring engine for BrandCraft.
+Compiles the mock_ai lexicon into a single regex once, then tokenizes and
+counts a whole batch of texts in one pass over their concatenation.
+"""
+import re
+from bisect import bisect_right
+from typing import List, Tuple
+
+import mock_ai
+
+
+class SentimentEngine:
+    """Precompiled lexicon scorer matching mock_ai.analyze_sentiment's tokenization."""
+
+    def __init__(self, positive_words=mock_ai.POSITIVE_WORDS, negative_words=mock_ai.NEGATIVE_WORDS):
+        self.polarity = {w: 1 for w in positive_words}
+        self.polarity.update({w: -1 for w in negative_words})
+        # Whole whitespace-delimited tokens only, same as str.split() membership checks
+        alternation = "|".join(re.escape(w) for w in sorted(self.polarity, key=len, reverse=True))
+        self.pattern = re.compile(rf"(?<!\S)(?:{alternation})(?!\S)")
+
+    def count(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """Return (positive, negative) lexicon hit counts for every text in the batch."""
+        if not texts:
+            return []
+        counts = [[0, 0] for _ in texts]
+
+        # Lowercase per text first: str.lower() can change length, which would skew offsets
+        lowered = [text.lower() for text in texts]
+        starts = []
+        offset = 0
+        for text in lowered:
+            starts.append(offset)
+            offset += len(text) + 1
+        corpus = "\n".join(lowered)
+
+        for match in self.pattern.finditer(corpus):
+            idx = bisect_right(starts, match.start()) - 1
+            if self.polarity[match.group()] > 0:
+                counts[idx][0] += 1
+            else:
+                counts[idx][1] += 1
+        return [(pos, neg) for pos, neg in counts]
+
+    def score(self, texts: List[str]) -> List[dict]:
+        """Score a batch of texts, returning one analyze_sentiment-shaped result per text."""
+        return mock_ai.sentiment_batch(self.count(texts))
+
+
+engine = SentimentEngine()
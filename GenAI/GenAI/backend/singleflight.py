@@ -0,0 +1,40 @@
+"""
+Single-flight request coalescing.
+Concurrent calls with the same key wait on one computation and share its
+result; the next call after it finishes starts a fresh one.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return await fn(), or the result of an identical call already in flight."""
+        self.calls += 1
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            # The work runs as its own task so one caller disconnecting doesn't cancel it for the rest
+            inflight = asyncio.ensure_future(fn())
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(inflight)
+
+    def _forget(self, key: str, done: asyncio.Future):
+        self._inflight.pop(key, None)
+        if not done.cancelled():
+            done.exception()  # mark retrieved even if every caller went away
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "coalescing_ratio": round(self.shared / self.calls, 3) if self.calls else 0.0,
+            "in_flight": len(self._inflight),
+        }
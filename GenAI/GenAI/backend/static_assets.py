@@ -0,0 +1,155 @@
+"""
+Static frontend pipeline for BrandCraft.
+At startup every file under the frontend directory is read once, fingerprinted
+(content SHA-256) and precompressed (gzip, plus brotli when the `brotli`
+package is installed). Requests are then answered from memory: ETag /
+If-None-Match revalidation, Accept-Encoding negotiation, and immutable cache
+headers for fingerprinted URLs such as /css/style.3f2a9c1b7e.css.
+
+HTML pages are rewritten to reference the fingerprinted css/js URLs, so a
+deploy changes the page's ETag and the browser picks up the new assets.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+FINGERPRINT_LENGTH = 10
+MIN_COMPRESS_SIZE = 512  # bytes; smaller files are served as-is
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+ASSET_DIRS = ("css", "js")
+
+_ASSET_REF = re.compile(r'((?:href|src)=")((?:%s)/[^"?#]+)(")' % "|".join(ASSET_DIRS))
+_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+@dataclass
+class Asset:
+    body: bytes
+    media_type: str
+    etag: str
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str) -> "Asset":
+        digest = hashlib.sha256(body).hexdigest()
+        asset = cls(body, media_type, f'"{digest[:32]}"')
+        if len(body) >= MIN_COMPRESS_SIZE:
+            candidates = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli:
+                candidates["br"] = brotli.compress(body, quality=11)
+            # Keep only encodings that actually save bytes
+            asset.encoded = {enc: data for enc, data in candidates.items() if len(data) < len(body)}
+        return asset
+
+    @property
+    def fingerprint(self) -> str:
+        return self.etag.strip('"')[:FINGERPRINT_LENGTH]
+
+
+def fingerprinted_name(path: str, fingerprint: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{fingerprint}{ext}"
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate(asset: Asset, accept_encoding: str) -> Optional[str]:
+    """Pick the best precompressed encoding the client accepts, or None for identity."""
+    if not asset.encoded:
+        return None
+    accepted = parse_accept_encoding(accept_encoding)
+    for encoding in _ENCODINGS:
+        if encoding in asset.encoded and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+
+
+class StaticAssets:
+    """In-memory frontend: `assets` by URL path, `pages` by page name."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.assets: Dict[str, tuple] = {}  # url path -> (Asset, cache-control)
+        self.pages: Dict[str, Asset] = {}
+        self.load()
+
+    def load(self):
+        urls = {}
+        for subdir in ASSET_DIRS:
+            base = os.path.join(self.directory, subdir)
+            if not os.path.isdir(base):
+                continue
+            for root, _, files in os.walk(base):
+                for filename in files:
+                    rel = os.path.relpath(os.path.join(root, filename), self.directory).replace(os.sep, "/")
+                    asset = Asset.build(self._read(rel), self._media_type(rel))
+                    hashed = fingerprinted_name(rel, asset.fingerprint)
+                    self.assets[f"/{rel}"] = (asset, REVALIDATE_CACHE_CONTROL)
+                    self.assets[f"/{hashed}"] = (asset, IMMUTABLE_CACHE_CONTROL)
+                    urls[rel] = hashed
+        for filename in sorted(os.listdir(self.directory)):
+            page, ext = os.path.splitext(filename)
+            if ext == ".html":
+                html = self._read(filename).decode("utf-8")
+                html = _ASSET_REF.sub(lambda m: m.group(1) + urls.get(m.group(2), m.group(2)) + m.group(3), html)
+                self.pages[page] = Asset.build(html.encode("utf-8"), "text/html; charset=utf-8")
+
+    def _read(self, rel: str) -> bytes:
+        with open(os.path.join(self.directory, rel), "rb") as f:
+            return f.read()
+
+    @staticmethod
+    def _media_type(path: str) -> str:
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return f"{media_type}; charset=utf-8" if media_type.startswith("text/") or media_type.endswith("javascript") else media_type
+
+    def page(self, name: str) -> Asset:
+        return self.pages.get(name) or self.pages["index"]
+
+    def get(self, path: str):
+        return self.assets.get(path)
+
+    @staticmethod
+    def respond(asset: Asset, request: Request, cache_control: str = REVALIDATE_CACHE_CONTROL) -> Response:
+        encoding = negotiate(asset, request.headers.get("accept-encoding", ""))
+        # Each encoding is a separate representation, so it gets its own strong ETag
+        etag = f'{asset.etag[:-1]}-{encoding}"' if encoding else asset.etag
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return Response(asset.encoded[encoding], media_type=asset.media_type, headers=headers)
+        return Response(asset.body, media_type=asset.media_type, headers=headers)
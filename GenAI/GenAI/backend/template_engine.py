@@ -0,0 +1,147 @@
+"""
+Precompiled content templates for BrandCraft.
+Each content type lives in templates/content/<type>.txt and is parsed once
+into segment lists, by registry.load() at startup (main.warm_caches) or else
+by the first render; rendering only walks the requested variant and
+interpolates its variables.
+
+Template file format:
+
+    title: Social Media Post
+    seo_keywords: {brand_name}, AI branding, brand identity
+    --- short
+    ...body...
+    --- medium
+    ...body...
+
+Placeholders are {name}; {#name}...{/name} renders its body only when `name`
+is non-empty. Available names: brand_name, brand_tag (brand name without
+spaces), keywords, tone.
+"""
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+TEMPLATE_DIR = os.getenv("CONTENT_TEMPLATE_DIR", os.path.join(os.path.dirname(__file__), "templates", "content"))
+LENGTHS = ("short", "medium", "long")
+DEFAULT_LENGTH = "medium"
+DEFAULT_TYPE = "social_post"
+
+_TOKEN = re.compile(r"\{([#/]?)(\w+)\}")
+_VARIANT_HEADER = re.compile(r"^--- (\w+)\s*$")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+def compile_template(text: str) -> list:
+    """Compile template text into a list of str / ("var", name) / ("section", name, segments)."""
+    root: list = []
+    stack = [(None, root)]
+    pos = 0
+    for match in _TOKEN.finditer(text):
+        if match.start() > pos:
+            stack[-1][1].append(text[pos:match.start()])
+        kind, name = match.groups()
+        if kind == "#":
+            section: list = []
+            stack[-1][1].append(("section", name, section))
+            stack.append((name, section))
+        elif kind == "/":
+            if stack[-1][0] != name:
+                raise TemplateError(f"Unexpected {{/{name}}}")
+            stack.pop()
+        else:
+            stack[-1][1].append(("var", name))
+        pos = match.end()
+    if len(stack) > 1:
+        raise TemplateError(f"Unclosed {{#{stack[-1][0]}}}")
+    if pos < len(text):
+        root.append(text[pos:])
+    return root
+
+
+def render(segments: list, context: dict) -> str:
+    parts = []
+    for segment in segments:
+        if isinstance(segment, str):
+            parts.append(segment)
+        elif segment[0] == "var":
+            parts.append(str(context.get(segment[1], "")))
+        elif context.get(segment[1]):
+            parts.append(render(segment[2], context))
+    return "".join(parts)
+
+
+class ContentTemplate:
+    def __init__(self, name: str, title: str, seo_keywords: List[str], variants: Dict[str, str]):
+        missing = [length for length in LENGTHS if length not in variants]
+        if missing:
+            raise TemplateError(f"Template '{name}' is missing variants: {', '.join(missing)}")
+        self.name = name
+        self.title = compile_template(title)
+        self.seo_keywords = [compile_template(k) for k in seo_keywords]
+        self.variants = {length: compile_template(body) for length, body in variants.items()}
+
+    @classmethod
+    def parse(cls, name: str, text: str) -> "ContentTemplate":
+        headers, variants = {}, {}
+        current = None
+        for line in text.splitlines(keepends=True):
+            header = _VARIANT_HEADER.match(line)
+            if header:
+                current = header.group(1)
+                variants[current] = []
+            elif current is not None:
+                variants[current].append(line)
+            elif line.strip():
+                key, _, value = line.partition(":")
+                headers[key.strip()] = value.strip()
+        bodies = {length: "".join(lines).rstrip("\n") for length, lines in variants.items()}
+        seo_keywords = [k.strip() for k in headers.get("seo_keywords", "").split(",") if k.strip()]
+        return cls(name, headers.get("title", name), seo_keywords, bodies)
+
+    def render(self, context: dict, length: str = DEFAULT_LENGTH) -> dict:
+        body = self.variants.get(length, self.variants[DEFAULT_LENGTH])
+        return {
+            "title": render(self.title, context),
+            "content": render(body, context),
+            "seo_keywords": [render(k, context) for k in self.seo_keywords],
+        }
+
+
+class TemplateRegistry:
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self.templates: Dict[str, ContentTemplate] = {}
+        self._loaded = directory is None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Parse the templates in `directory`, once."""
+        with self._lock:
+            if not self._loaded:
+                self.load_directory(self.directory)
+                self._loaded = True
+
+    def register(self, template: ContentTemplate):
+        self.templates[template.name] = template
+
+    def load_directory(self, path: str):
+        """Register every <content_type>.txt template in `path`."""
+        for filename in sorted(os.listdir(path)):
+            name, ext = os.path.splitext(filename)
+            if ext == ".txt":
+                with open(os.path.join(path, filename), encoding="utf-8") as f:
+                    self.register(ContentTemplate.parse(name, f.read()))
+
+    def render(self, content_type: str, context: dict, length: str = DEFAULT_LENGTH) -> dict:
+        if not self._loaded:
+            self.load()
+        template = self.templates.get(content_type) or self.templates[DEFAULT_TYPE]
+        return template.render(context, length)
+
+
+registry = TemplateRegistry(TEMPLATE_DIR)
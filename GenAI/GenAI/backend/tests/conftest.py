@@ -0,0 +1,39 @@
+"""
+Shared fixtures. Settings are read at import time, so the scratch database and
+asset directory are configured before any backend module is imported.
+Run from the backend directory: python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+
+SCRATCH = tempfile.mkdtemp(prefix="brandcraft-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(SCRATCH, 'test.db')}"
+os.environ["LOGO_CACHE_DIR"] = os.path.join(SCRATCH, "logos")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+_accounts = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def client():
+    import main
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def user(client):
+    """A fresh account; returns (user id, auth headers)."""
+    n = next(_accounts)
+    email = f"user{n}@example.com"
+    response = client.post("/api/register", json={"username": f"user{n}", "email": email, "password": "pw"})
+    assert response.status_code == 200, response.text
+    token = client.post("/api/login", json={"email": email, "password": "pw"}).json()["access_token"]
+    return response.json()["id"], {"Authorization": f"Bearer {token}"}
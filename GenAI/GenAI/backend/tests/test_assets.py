@@ -0,0 +1,13 @@
+import os
+
+import logo_renderer
+
+
+def test_logo_revalidation_requires_the_file(client):
+    digest = logo_renderer.store_asset("<svg xmlns='http://www.w3.org/2000/svg'/>")
+    url = f"/api/assets/logos/{digest}.svg"
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    os.remove(logo_renderer.asset_path(digest))
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 404
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 404
@@ -0,0 +1,56 @@
+import asyncio
+import inspect
+import threading
+
+import anyio.to_thread
+
+import auth
+import routes.auth_routes as auth_routes
+
+
+def test_register_and_login_are_async():
+    assert inspect.iscoroutinefunction(auth_routes.register)
+    assert inspect.iscoroutinefunction(auth_routes.login)
+
+
+def test_hashing_does_not_hold_a_threadpool_thread():
+    release = threading.Event()
+
+    async def run():
+        job = asyncio.ensure_future(auth.hash_pool.run(release.wait))
+        await asyncio.sleep(0.05)  # the job is now blocked on the hash pool
+        borrowed = anyio.to_thread.current_default_thread_limiter().borrowed_tokens
+        release.set()
+        await job
+        return borrowed
+
+    assert asyncio.run(run()) == 0
+    assert auth.hash_pool.pending == 0
+
+
+def test_login_round_trip(client, user):
+    _, headers = user
+    assert client.get("/api/me", headers=headers).status_code == 200
+
+
+def test_saturated_hash_pool_returns_503(client, monkeypatch):
+    monkeypatch.setattr(auth.hash_pool, "_slots", threading.BoundedSemaphore(1))
+    auth.hash_pool._slots.acquire()  # the only slot is taken
+    response = client.post("/api/register", json={"username": "busy", "email": "busy@example.com", "password": "pw"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(auth.HASH_RETRY_AFTER_SECONDS)
+    assert auth.hash_pool.pending == 0
+
+
+def test_login_upgrades_weak_hashes(client, monkeypatch):
+    from database import SessionLocal
+    import models
+    with SessionLocal() as db:
+        db.add(models.User(username="weak", email="weak@example.com", role="user",
+                           hashed_password=auth.hash_password("pw", rounds=4)))
+        db.commit()
+    monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 5)
+    assert client.post("/api/login", json={"email": "weak@example.com", "password": "pw"}).status_code == 200
+    with SessionLocal() as db:
+        stored = db.query(models.User).filter(models.User.email == "weak@example.com").one().hashed_password
+    assert stored.split("$")[2] == "05"
@@ -0,0 +1,74 @@
+import time
+from datetime import datetime, timedelta
+
+import models
+from conversation import Conversation, ConversationStore
+from database import SessionLocal
+from intent_router import IntentRouter
+from write_behind import write_queue
+
+
+def _chat(client, headers, message):
+    response = client.post("/api/chat", headers=headers, json={"message": message})
+    assert response.status_code == 200, response.text
+    return response.json()["response"]
+
+
+def test_greeting_after_swot_gets_generic_reply(client, user):
+    _, headers = user
+    assert _chat(client, headers, "Give me a SWOT analysis").startswith("**SWOT")
+    for message in ["hello", "thanks, what about my logo colors?"] + [f"hi number {i}" for i in range(12)]:
+        assert _chat(client, headers, message).startswith("Thanks for your question"), message
+
+
+def test_keyword_in_message_beats_conversation(client, user):
+    _, headers = user
+    for _ in range(3):
+        _chat(client, headers, "swot please")
+    assert _chat(client, headers, "campaign ideas").startswith("**Marketing Campaign")
+
+
+def test_context_only_breaks_ties():
+    router = IntentRouter()
+    router.register("a", ["alpha"])
+    router.register("b", ["beta"])
+    assert router.route("hello", context="beta") is None
+    assert router.route("alpha beta").name == "a"
+    assert router.route("alpha beta", context="beta beta beta").name == "b"
+
+
+def test_window_is_bounded_and_summarized():
+    conversation = Conversation(window=3)
+    for i in range(10):
+        conversation.add(f"campaign idea {i}", "**Marketing Campaign Ideas:**\nbody")
+    assert [turn.message for turn in conversation.turns] == ["campaign idea 7", "campaign idea 8", "campaign idea 9"]
+    assert conversation.render().splitlines()[0] == "Earlier (7 turns): campaign x7"
+    assert conversation.last_message() == "campaign idea 9"
+
+
+def test_cold_load_merges_unflushed_turns(client, user):
+    user_id, _ = user
+    start = datetime.utcnow() - timedelta(minutes=5)
+    with SessionLocal() as db:
+        db.add_all(models.ChatHistory(user_id=user_id, message=f"stored {i}", response="r",
+                                      created_at=start + timedelta(seconds=i)) for i in range(3))
+        db.commit()
+    # A turn still buffered in the write-behind queue (as if just answered)
+    write_queue.enqueue(models.ChatHistory, {"user_id": user_id, "message": "buffered", "response": "r",
+                                             "created_at": datetime.utcnow()})
+    with SessionLocal() as db:
+        conversation = ConversationStore(window=10).load(db, user_id)
+    assert [turn.message for turn in conversation.turns][-4:] == ["stored 0", "stored 1", "stored 2", "buffered"]
+
+
+def test_history_is_paginated(client, user):
+    _, headers = user
+    for i in range(5):
+        _chat(client, headers, f"message {i}")
+    deadline = time.monotonic() + 5
+    while len(client.get("/api/chat/history", headers=headers).json()) < 5 and time.monotonic() < deadline:
+        time.sleep(0.1)  # rows reach the table on the next write-behind flush
+    first = client.get("/api/chat/history?limit=3", headers=headers)
+    assert [t["message"] for t in first.json()] == ["message 0", "message 1", "message 2"]
+    rest = client.get(f"/api/chat/history?cursor={first.headers['X-Next-Cursor']}", headers=headers)
+    assert [t["message"] for t in rest.json()] == ["message 3", "message 4"]
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+from sqlalchemy import select
+
+import database
+import models
+
+
+def test_async_url_maps_any_sync_driver_by_backend():
+    assert database.async_url("sqlite:///./x.db").drivername == "sqlite+aiosqlite"
+    assert database.async_url("postgresql://u@h/db").drivername == "postgresql+asyncpg"
+    assert database.async_url("postgresql+psycopg2://u@h/db").drivername == "postgresql+asyncpg"
+    assert database.async_url("mysql+pymysql://u@h/db").drivername == "mysql+aiomysql"
+
+
+def test_async_engine_is_created_once_under_concurrency():
+    factories = []
+    threads = [threading.Thread(target=lambda: factories.append(database.get_async_sessionmaker()))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(f) for f in factories}) == 1
+
+
+def test_get_async_db_opens_a_session(client, user):
+    user_id, _ = user
+
+    async def lookup():
+        sessions = database.get_async_db()
+        db = await sessions.__anext__()
+        try:
+            return (await db.execute(select(models.User.username).where(models.User.id == user_id))).scalar_one()
+        finally:
+            await sessions.aclose()
+
+    async def run():
+        try:
+            return await lookup()
+        finally:
+            await database.dispose_async_db()
+
+    assert asyncio.run(run()).startswith("user")
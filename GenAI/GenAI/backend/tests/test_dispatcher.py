@@ -0,0 +1,153 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+import models
+from generation import Dispatcher, MockBackend, SimulatedLatencyBackend
+from write_behind import WriteBehindQueue
+
+IDENTITY = {"brand_name": "Nova", "industry": "tech", "target_audience": "developers"}
+
+
+def test_timeout_becomes_504():
+    async def scenario():
+        dispatcher = Dispatcher(SimulatedLatencyBackend(latency=0.2, timeout=0.02))
+        with pytest.raises(HTTPException) as raised:
+            await dispatcher.submit("brand_identity", **IDENTITY)
+        return raised.value, dispatcher
+
+    error, dispatcher = asyncio.run(scenario())
+    assert error.status_code == 504 and dispatcher.timeouts == 1
+
+
+def test_identical_requests_share_one_call():
+    async def scenario():
+        backend = SimulatedLatencyBackend(latency=0.05)
+        dispatcher = Dispatcher(backend)
+        results = await asyncio.gather(*(dispatcher.submit("brand_identity", **IDENTITY) for _ in range(20)))
+        return backend, results
+
+    backend, results = asyncio.run(scenario())
+    assert backend.calls == 1
+    assert all(r == results[0] for r in results)
+
+
+def test_sentiment_requests_are_batched():
+    async def scenario():
+        backend = SimulatedLatencyBackend(latency=0.05)
+        dispatcher = Dispatcher(backend)
+        results = await asyncio.gather(*(dispatcher.submit("sentiment", text=f"great product {i}") for i in range(30)))
+        return backend, results
+
+    backend, results = asyncio.run(scenario())
+    assert len(results) == 30 and all("positive" in r for r in results)
+    assert backend.batches == 1 and backend.calls == 0
+
+
+def test_mock_generators_run_off_the_event_loop(monkeypatch):
+    import mock_ai
+    threads = []
+    original = mock_ai.generate_brand_identity
+
+    def spy(**params):
+        threads.append(threading.get_ident())
+        return original(**params)
+
+    monkeypatch.setattr(mock_ai, "generate_brand_identity", spy)
+
+    async def scenario():
+        await Dispatcher(MockBackend()).submit("brand_identity", **IDENTITY)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert threads and threads[0] != loop_thread
+
+
+def test_full_queue_does_not_block_the_loop():
+    queue = WriteBehindQueue(session_factory=None, max_pending=1, flush_interval=60, overflow_policy="block")
+    queue._start = lambda: None  # no flusher: the buffer stays full until released
+    watchdog_fired = []
+
+    def release():
+        with queue._cond:
+            queue._pending.popleft()
+            queue._cond.notify_all()
+
+    def watchdog():
+        # Unblocks a regressed, loop-blocking enqueue so the test fails instead of hanging
+        watchdog_fired.append(True)
+        release()
+
+    async def scenario():
+        assert queue.try_enqueue(models.ChatHistory, {"n": 1})
+        assert not queue.try_enqueue(models.ChatHistory, {"n": 2})
+        timer = threading.Timer(2, watchdog)
+        timer.start()
+        blocked = asyncio.ensure_future(queue.enqueue_async(models.ChatHistory, {"n": 2}))
+        await asyncio.sleep(0.05)
+        waiting = not blocked.done()
+        timer.cancel()
+        if not watchdog_fired:
+            release()
+        await asyncio.wait_for(blocked, 5)
+        return waiting
+
+    assert asyncio.run(scenario())
+    assert not watchdog_fired
+    assert queue.stats()["pending"] == 1
+
+
+def test_stream_yields_the_first_chunk_before_generation_finishes():
+    async def scenario():
+        backend = SimulatedLatencyBackend(latency=0, token_latency=0.02)
+        stream = Dispatcher(backend).stream("chat", message="Generate a SWOT analysis")
+        await stream.__anext__()
+        produced_before_first = backend.streamed
+        rest = [event async for event in stream]
+        return produced_before_first, rest, backend
+
+    produced_before_first, rest, backend = asyncio.run(scenario())
+    assert produced_before_first == 1
+    assert len(rest) > 10 and backend.streamed == len(rest) + 1
+    assert "suggestions" in rest[-1]
+
+
+def test_stream_timeout_becomes_504():
+    async def scenario():
+        dispatcher = Dispatcher(SimulatedLatencyBackend(token_latency=0.2, timeout=0.02))
+        with pytest.raises(HTTPException) as raised:
+            await dispatcher.stream("chat", message="hello").__anext__()
+        return raised.value, dispatcher
+
+    error, dispatcher = asyncio.run(scenario())
+    assert error.status_code == 504 and dispatcher.timeouts == 1
+    assert dispatcher._semaphore._value == dispatcher.backend.max_concurrency
+
+
+def test_chat_stream_endpoint_goes_through_the_dispatcher(client, user):
+    from generation import dispatcher
+    _, headers = user
+    response = client.post("/api/chat/stream", json={"message": "Generate a SWOT analysis"}, headers=headers)
+    assert response.status_code == 200
+    assert response.text.count("data: ") > 10 and "event: done" in response.text
+    assert dispatcher._semaphore._value == dispatcher.backend.max_concurrency
+
+
+def test_cached_misses_coalesce_once_in_the_dispatcher():
+    from functools import partial
+    from response_cache import ResponseCache
+
+    async def scenario():
+        backend = SimulatedLatencyBackend(latency=0.05)
+        dispatcher = Dispatcher(backend)
+        cache = ResponseCache()
+        generate = partial(dispatcher.submit, "brand_identity")
+        await asyncio.gather(*(cache.get_or_generate("brand_identity", generate, IDENTITY) for _ in range(10)))
+        return backend, dispatcher, cache
+
+    backend, dispatcher, cache = asyncio.run(scenario())
+    assert backend.calls == 1
+    assert dispatcher.stats()["shared"] == 9
+    assert "single_flight" not in cache.stats()
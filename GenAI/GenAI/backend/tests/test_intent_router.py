@@ -0,0 +1,49 @@
+import threading
+
+from intent_router import AhoCorasick, IntentRouter
+
+
+def _scores(router, message):
+    return {s.intent.name: s.score for s in router.classify(message)}
+
+
+def test_rebuilding_does_not_count_suffix_matches_again():
+    router = IntentRouter()
+    router.register("a", ["market"])
+    router.register("b", ["ark"])
+    assert _scores(router, "market") == {"a": 1.0, "b": 1.0}
+    router.register("c", ["zebra"])
+    assert _scores(router, "market") == {"a": 1.0, "b": 1.0}
+    router.register("d", ["quokka"])
+    router.build()
+    assert _scores(router, "market") == {"a": 1.0, "b": 1.0}
+
+
+def test_matches_every_overlapping_pattern():
+    automaton = AhoCorasick()
+    for pattern in ("he", "she", "his", "hers"):
+        automaton.add(pattern, pattern)
+    assert sorted(automaton.iter_matches("ushers")) == ["he", "hers", "she"]
+
+
+def test_concurrent_adds_and_searches():
+    automaton = AhoCorasick()
+    automaton.add("brand", "brand")
+    errors = []
+
+    def search():
+        try:
+            for _ in range(2000):
+                assert "brand" in list(automaton.iter_matches("my brand"))
+        except Exception as e:  # surfaced below; threads swallow exceptions otherwise
+            errors.append(e)
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for i in range(500):
+        automaton.add(f"keyword{i}", i)
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert list(automaton.iter_matches("keyword499")) == [4, 49, 499]
@@ -0,0 +1,76 @@
+from database import SessionLocal
+from invalidation import InvalidationBus
+import models
+import routes.project_routes as project_routes
+
+
+def _insert(event_id: int, key: str):
+    with SessionLocal() as db:
+        db.add(models.InvalidationEvent(id=event_id, topic="gap-test", key=key, origin="elsewhere"))
+        db.commit()
+
+
+def test_poll_applies_an_id_that_commits_after_a_later_one(client):
+    bus = InvalidationBus(enabled=True, gap_timeout=30)
+    seen = []
+    bus.subscribe("gap-test", seen.append)
+    bus.start()
+    bus.stop()  # tail by hand
+    base = bus.last_id
+    _insert(base + 3, "late-writer-committed-first")
+    assert bus.poll() == 1
+    assert bus.stats()["gaps"] == 2
+    _insert(base + 1, "early-writer")  # its transaction committed last
+    assert bus.poll() == 1
+    assert seen == ["late-writer-committed-first", "early-writer"]
+    assert bus.stats()["gaps"] == 1
+
+
+def test_skipped_ids_age_out(client):
+    bus = InvalidationBus(enabled=True, gap_timeout=0)
+    bus.start()
+    bus.stop()
+    _insert(bus.last_id + 2, "k")
+    bus.poll()
+    assert bus.stats()["gaps"] == 0
+
+
+def test_brand_kit_is_private_to_the_project_owner(client, user):
+    _, owner = user
+    client.post("/api/register", json={"username": "other", "email": "other@example.com", "password": "pw"})
+    token = client.post("/api/login", json={"email": "other@example.com", "password": "pw"}).json()["access_token"]
+    other = {"Authorization": f"Bearer {token}"}
+    project_id = client.post("/api/projects", json={"name": "p", "description": "d"}, headers=owner).json()["id"]
+    asset = client.post("/api/brand-kit", json={"project_id": project_id, "asset_type": "color",
+                                                "asset_value": "#000"}, headers=owner).json()
+    assert client.get(f"/api/brand-kit/{project_id}", headers=other).status_code == 404
+    assert client.post("/api/brand-kit", json={"project_id": project_id, "asset_type": "color",
+                                               "asset_value": "#fff"}, headers=other).status_code == 404
+    assert client.delete(f"/api/brand-kit/{asset['id']}", headers=other).status_code == 404
+
+
+def test_brand_kit_cache_follows_writes(client, user):
+    _, headers = user
+    project_id = client.post("/api/projects", json={"name": "p", "description": "d"}, headers=headers).json()["id"]
+    kit = lambda: [a["asset_value"] for a in client.get(f"/api/brand-kit/{project_id}", headers=headers).json()]
+    assert kit() == []
+    assert project_routes.brand_kits.get(project_id) is not None
+    asset = client.post("/api/brand-kit", json={"project_id": project_id, "asset_type": "color",
+                                                "asset_value": "#123"}, headers=headers).json()
+    assert kit() == ["#123"]
+    client.delete(f"/api/brand-kit/{asset['id']}", headers=headers)
+    assert kit() == []
+    client.delete(f"/api/projects/{project_id}", headers=headers)
+    assert client.get(f"/api/brand-kit/{project_id}", headers=headers).status_code == 404
+
+
+def test_invalidation_counter_does_not_lose_increments():
+    import threading
+    before = project_routes._invalidations
+    threads = [threading.Thread(target=lambda: [project_routes._forget_brand_kit("0") for _ in range(2000)])
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert project_routes._invalidations == before + 16000
@@ -0,0 +1,22 @@
+import main
+import metrics
+import sentiment_engine
+
+
+def _count(function: str) -> int:
+    """How many calls of `function` the generator latency histogram has observed."""
+    for line in metrics.generator_latency.render():
+        if line.startswith("brandcraft_generator_duration_seconds_count") and f'"{function}"' in line:
+            return int(float(line.rsplit(" ", 1)[1]))
+    return 0
+
+
+def test_metrics_middleware_is_outermost():
+    assert main.app.user_middleware[0].cls is metrics.MetricsMiddleware
+
+
+def test_sentiment_batches_are_timed_once_per_batch():
+    before = _count("sentiment_batch")
+    sentiment_engine.engine.score(["great product", "awful service", "fine"])
+    assert _count("sentiment_batch") == before + 1
+    assert _count("sentiment_from_counts") == 0
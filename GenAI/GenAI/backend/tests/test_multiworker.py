@@ -0,0 +1,138 @@
+"""
+Multi-worker consistency: migrates a scratch SQLite database, starts uvicorn
+with several worker processes in production mode, and checks that a write
+handled by one worker invalidates the cached state of all of them. Requests
+use a fresh connection each, so the kernel spreads them over the workers.
+"""
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+WORKERS = 3
+POLL_INTERVAL = 0.1  # seconds; INVALIDATION_POLL_INTERVAL for the workers
+BOUND = 2.0  # seconds every worker gets to apply an invalidation
+PROBES = 30  # fresh-connection requests per round
+
+
+def call(base: str, method: str, path: str, body: dict = None, token: str = None):
+    """One request on a new connection; returns (status, parsed JSON body)."""
+    headers = {"Connection": "close", "Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base + path, data=data, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def cluster():
+    """Yields (base url, database path) of a running multi-worker server."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "multiworker.db")
+        env = {**os.environ, "APP_ENV": "production", "DATABASE_URL": f"sqlite:///{db_path}",
+               "LOGO_CACHE_DIR": os.path.join(tmp, "logos"), "RATE_LIMIT_ENABLED": "0",
+               "WEB_CONCURRENCY": str(WORKERS), "INVALIDATION_BUS": "1",
+               "INVALIDATION_POLL_INTERVAL": str(POLL_INTERVAL)}
+        subprocess.run([sys.executable, "migrations.py"], env=env, cwd=BACKEND, capture_output=True, check=True)
+        server = subprocess.Popen([sys.executable, "-c", f"import uvicorn; uvicorn.run('main:app', host='127.0.0.1', "
+                                   f"port={port}, workers={WORKERS}, log_level='warning')"], env=env, cwd=BACKEND)
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                assert server.poll() is None, f"server exited with {server.returncode}"
+                assert time.monotonic() < deadline, "server did not become ready"
+                try:
+                    if call(base, "GET", "/health")[0] == 200:
+                        break
+                except OSError:
+                    pass
+                time.sleep(0.2)
+            yield base, db_path
+        finally:
+            server.terminate()
+            server.wait(timeout=15)
+
+
+def account(base: str, name: str) -> tuple:
+    """Registers `name`; returns (user id, access token)."""
+    status, user = call(base, "POST", "/api/register", {"username": name, "email": f"{name}@example.com",
+                                                        "password": "check-password"})
+    assert status == 200, user
+    status, body = call(base, "POST", "/api/login", {"email": f"{name}@example.com", "password": "check-password"})
+    assert status == 200, body
+    return user["id"], body["access_token"]
+
+
+def converges(probe) -> bool:
+    """True once a whole round of `probe()` calls succeeds within BOUND."""
+    started = time.monotonic()
+    while time.monotonic() - started < BOUND:
+        if all(probe() for _ in range(PROBES)):
+            return True
+    return False
+
+
+def test_every_worker_is_reached(cluster):
+    base, _ = cluster
+    pids = {call(base, "GET", "/health")[1]["worker"]["pid"] for _ in range(PROBES)}
+    assert len(pids) > 1
+
+
+def test_suspension_reaches_every_worker(cluster):
+    base, db_path = cluster
+    admin_id, admin_token = account(base, "checkadmin")
+    user_id, user_token = account(base, "checkuser")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE users SET role = 'admin' WHERE id = ?", (admin_id,))
+    assert all(call(base, "GET", "/api/me", token=user_token)[0] == 200 for _ in range(PROBES))
+
+    status, body = call(base, "PUT", f"/api/admin/users/{user_id}/suspend", token=admin_token)
+    assert status == 200 and body["is_active"] is False, body
+    assert converges(lambda: call(base, "GET", "/api/me", token=user_token)[0] == 403)
+
+
+def test_brand_asset_delete_reaches_every_worker(cluster):
+    base, _ = cluster
+    _, token = account(base, "checkassets")
+    project = call(base, "POST", "/api/projects", {"name": "p", "description": "d"}, token=token)[1]
+    status, asset = call(base, "POST", "/api/brand-kit", {"project_id": project["id"], "asset_type": "color",
+                                                          "asset_value": "#123"}, token=token)
+    assert status == 200, asset
+    kit = lambda: [a["id"] for a in call(base, "GET", f"/api/brand-kit/{project['id']}", token=token)[1]]
+    assert all(kit() == [asset["id"]] for _ in range(PROBES))  # cached in every worker
+
+    assert call(base, "DELETE", f"/api/brand-kit/{asset['id']}", token=token)[0] == 200
+    assert converges(lambda: kit() == [])
+
+
+def test_project_delete_reaches_every_worker(cluster):
+    base, _ = cluster
+    _, token = account(base, "checkprojects")
+    project = call(base, "POST", "/api/projects", {"name": "p", "description": "d"}, token=token)[1]
+    path = f"/api/brand-kit/{project['id']}"
+    assert all(call(base, "GET", path, token=token)[0] == 200 for _ in range(PROBES))
+
+    assert call(base, "DELETE", f"/api/projects/{project['id']}", token=token)[0] == 200
+    assert converges(lambda: call(base, "GET", path, token=token)[0] == 404)
@@ -0,0 +1,78 @@
+import models
+from database import SessionLocal
+
+
+def _projects(user_id, count):
+    with SessionLocal() as db:
+        db.add_all(models.Project(user_id=user_id, name=f"project {i}", description="d") for i in range(count))
+        db.commit()
+
+
+def test_unpaginated_request_returns_everything(client, user):
+    user_id, headers = user
+    _projects(user_id, 150)
+    response = client.get("/api/projects", headers=headers)
+    assert len(response.json()) == 150
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_limit_and_cursor_walk_all_rows(client, user):
+    user_id, headers = user
+    _projects(user_id, 150)
+    first = client.get("/api/projects?limit=100", headers=headers)
+    assert len(first.json()) == 100
+    rest = client.get(f"/api/projects?cursor={first.headers['X-Next-Cursor']}", headers=headers)
+    assert len(rest.json()) == 50 and "X-Next-Cursor" not in rest.headers
+    names = [p["name"] for p in first.json() + rest.json()]
+    assert len(set(names)) == 150
+
+
+def test_fields_projection(client, user):
+    user_id, headers = user
+    _projects(user_id, 3)
+    assert client.get("/api/projects?fields=name", headers=headers).json() == [
+        {"name": "project 0"}, {"name": "project 1"}, {"name": "project 2"}]
+
+
+def test_pages_walk_rows_without_a_timestamp(client, user):
+    user_id, headers = user
+    _projects(user_id, 5)
+    with SessionLocal() as db:
+        db.query(models.Project).filter(models.Project.user_id == user_id,
+                                        models.Project.name.in_(["project 1", "project 3"])).update(
+            {models.Project.created_at: None}, synchronize_session=False)
+        db.commit()
+    names, cursor = [], None
+    while True:
+        query = "fields=name&limit=2" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(f"/api/projects?{query}", headers=headers)
+        names += [p["name"] for p in page.json()]
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert names == ["project 1", "project 3", "project 0", "project 2", "project 4"]
+
+
+def test_pages_are_index_range_scans(client):
+    from datetime import datetime
+    from fastapi import Response
+    from sqlalchemy import event
+    from database import engine
+    from pagination import encode_cursor, keyset_page
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with SessionLocal() as db:
+            for model, filters in [(models.User, []), (models.BrandAsset, [models.BrandAsset.project_id == 1])]:
+                keyset_page(db, model, filters, Response(), 10, encode_cursor(datetime(2024, 1, 1), 5))
+                statement, parameters = statements[-1]
+                plan = " ".join(row[-1] for row in db.connection().exec_driver_sql(
+                    "EXPLAIN QUERY PLAN " + statement, parameters))
+                assert "USING INDEX" in plan and "TEMP B-TREE" not in plan, plan
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
@@ -0,0 +1,51 @@
+import asyncio
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+import profiling
+
+
+def _app(handler=None):
+    async def endpoint(request):
+        if handler:
+            await handler()
+        return PlainTextResponse("ok")
+    return profiling.ProfilingMiddleware(Starlette(routes=[Route("/", endpoint)]), max_concurrent=2)
+
+
+async def _get(app, headers):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get("/", headers=headers)
+
+
+def test_header_ignored_without_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "")
+    response = asyncio.run(_get(_app(), {"X-Profile": "1"}))
+    assert "x-profile-id" not in response.headers
+
+
+def test_header_needs_matching_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+    assert "x-profile-id" not in asyncio.run(_get(_app(), {"X-Profile": "1"})).headers
+    assert "x-profile-id" in asyncio.run(_get(_app(), {"X-Profile": "s3cret"})).headers
+
+
+def test_concurrent_profiles_are_capped(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+
+    async def scenario():
+        release = asyncio.Event()
+        app = _app(release.wait)
+        requests = [asyncio.ensure_future(_get(app, {"X-Profile": "s3cret"})) for _ in range(5)]
+        await asyncio.sleep(0.1)
+        assert app.active == 2
+        release.set()
+        return app, await asyncio.gather(*requests)
+
+    app, responses = asyncio.run(scenario())
+    assert all(r.status_code == 200 for r in responses)
+    assert sum("x-profile-id" in r.headers for r in responses) == 2
+    assert app.skipped == 3 and app.active == 0
@@ -0,0 +1,41 @@
+import ipaddress
+
+import pytest
+from starlette.requests import Request
+
+import ratelimit
+
+
+def _request(peer: str, forwarded: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "client": (peer, 1234), "headers": headers})
+
+
+@pytest.fixture
+def behind_proxy(monkeypatch):
+    monkeypatch.setattr(ratelimit, "TRUSTED_PROXIES", [ipaddress.ip_network("10.0.0.0/8")])
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies():
+    assert ratelimit.client_ip(_request("203.0.113.9", "198.51.100.1")) == "203.0.113.9"
+
+
+def test_forwarded_for_is_honored_from_a_trusted_proxy(behind_proxy):
+    # The client may prepend anything; the hop the trusted proxies appended is the one that counts
+    assert ratelimit.client_ip(_request("10.0.0.2", "1.2.3.4, 198.51.100.1, 10.0.0.1")) == "198.51.100.1"
+    assert ratelimit.client_ip(_request("10.0.0.2")) == "10.0.0.2"
+
+
+def test_forwarded_for_is_ignored_from_other_peers(behind_proxy):
+    assert ratelimit.client_ip(_request("203.0.113.9", "198.51.100.1")) == "203.0.113.9"
+
+
+def test_streaming_handlers_carry_rate_limit_headers(client, user, monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_ENABLED", True)
+    _, headers = user
+    chat = client.post("/api/chat/stream", json={"message": "hello"}, headers=headers)
+    upload = client.post("/api/sentiment-analyze/stream", content=b'{"text": "great"}\n', headers=headers)
+    for response, quota in ((chat, "chat"), (upload, "bulk")):
+        assert response.status_code == 200
+        assert response.headers["RateLimit-Limit"] == str(ratelimit.QUOTAS[quota].capacity)
+        assert "RateLimit-Remaining" in response.headers
@@ -0,0 +1,112 @@
+import json
+
+import routes.sentiment_routes as sentiment_routes
+
+
+def _stream(client, headers, body: str, format: str):
+    response = client.post(f"/api/sentiment-analyze/stream?format={format}", headers=headers,
+                           content=body.encode("utf-8"))
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_csv_quoted_field_spans_lines(client, user):
+    _, headers = user
+    body = 'id,text\r\n1,"great product\r\n\r\nbut ""slow"" shipping"\r\n2,terrible\r\n'
+    rows = _stream(client, headers, body, "csv")
+    assert [r["row"] for r in rows] == [1, 2]
+    assert all("error" not in r for r in rows)
+
+
+def test_csv_unterminated_quote_is_reported(client, user):
+    _, headers = user
+    rows = _stream(client, headers, 'text\ngood\n"never closed\nmore', "csv")
+    assert rows[0]["row"] == 1 and "error" not in rows[0]
+    assert rows[-1] == {"error": "Unterminated quoted field at end of CSV"}
+
+
+def test_results_keep_row_order(client, user):
+    _, headers = user
+    body = "\n".join(['{"text": "good"}', "not json", '{"text": "bad"}', '{"other": 1}', '"great"'])
+    rows = _stream(client, headers, body, "ndjson")
+    assert [r["row"] for r in rows] == [1, 2, 3, 4, 5]
+    assert [("error" in r) for r in rows] == [False, True, False, True, False]
+
+
+def test_line_limit_counts_bytes(client, user, monkeypatch):
+    _, headers = user
+    monkeypatch.setattr(sentiment_routes, "STREAM_MAX_LINE_BYTES", 16)
+    # 10 characters, 20 bytes, no newline yet when the limit is checked
+    rows = _stream(client, headers, '"' + "é" * 10, "ndjson")
+    assert rows == [{"error": "Line exceeds 16 bytes"}]
+
+
+def test_csv_stray_quote_in_unquoted_field(client, user):
+    _, headers = user
+    body = 'id,text\n1,5" screen is great\n2,terrible\n3,"fine"\n'
+    rows = _stream(client, headers, body, "csv")
+    assert [r["row"] for r in rows] == [1, 2, 3]
+    assert all("error" not in r for r in rows)
+
+
+def test_csv_malformed_row_is_reported_alone(client, user):
+    _, headers = user
+    rows = _stream(client, headers, 'text\n"closed"early\ngood\n', "csv")
+    assert [r["row"] for r in rows] == [1, 2]
+    assert rows[0]["error"].startswith("Malformed CSV row") and "error" not in rows[1]
+
+
+def test_response_runs_background_tasks():
+    import asyncio
+    from starlette.background import BackgroundTask
+
+    ran = []
+
+    async def body():
+        yield b"{}\n"
+
+    async def main():
+        uploaded = sentiment_routes.anyio.Event()
+        uploaded.set()
+        response = sentiment_routes._UploadStreamingResponse(body(), uploaded,
+                                                             background=BackgroundTask(ran.append, True))
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(10)
+
+        async def send(message):
+            sent.append(message)
+
+        await response({"type": "http"}, receive, send)
+        return sent
+
+    sent = asyncio.run(main())
+    assert ran == [True] and sent[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+
+
+def test_disconnect_during_upload_stops_scoring(client, user, monkeypatch):
+    import asyncio
+    import main
+
+    _, headers = user
+    scored = []
+    monkeypatch.setattr(sentiment_routes.engine, "score", lambda texts: scored.extend(texts) or [])
+    messages = [{"type": "http.request", "body": b'{"text": "good"}\n', "more_body": True},
+                {"type": "http.disconnect"}]
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/api/sentiment-analyze/stream",
+             "query_string": b"format=ndjson", "root_path": "", "scheme": "http",
+             "server": ("testserver", 80), "client": ("testclient", 50000), "http_version": "1.1",
+             "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]}
+    asyncio.run(main.app(scope, receive, send))
+    assert scored == []
+    assert b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body") == b""
@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.mark.parametrize("path", ["/css/style.css", "/js/app.js", "/login.html", "/app"])
+def test_frontend_answers_head_like_get(client, path):
+    get = client.get(path)
+    head = client.head(path)
+    assert get.status_code == head.status_code == 200
+    assert head.headers["etag"] == get.headers["etag"]
+    assert head.headers["content-type"] == get.headers["content-type"]
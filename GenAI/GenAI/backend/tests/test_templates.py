@@ -0,0 +1,18 @@
+import template_engine
+
+
+def test_templates_are_parsed_by_load_not_import():
+    registry = template_engine.TemplateRegistry(template_engine.TEMPLATE_DIR)
+    assert registry.templates == {}
+    registry.load()
+    assert template_engine.DEFAULT_TYPE in registry.templates
+
+
+def test_startup_loads_the_shared_registry(client):
+    assert template_engine.DEFAULT_TYPE in template_engine.registry.templates
+
+
+def test_render_loads_on_first_use():
+    registry = template_engine.TemplateRegistry(template_engine.TEMPLATE_DIR)
+    result = registry.render("social_post", {"brand_name": "Nova", "brand_tag": "Nova", "keywords": "", "tone": ""})
+    assert "Nova" in result["content"]
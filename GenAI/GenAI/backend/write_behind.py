@@ -0,0 +1,177 @@
+"""
+Write-behind persistence queue for BrandCraft.
+Audit rows the request never reads back (generated content, chat history,
+sentiment reports) are buffered here and flushed by a background thread in
+one bulk insert per model, once MAX_BATCH rows are pending or FLUSH_INTERVAL
+seconds have passed.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import insert
+from starlette.concurrency import run_in_threadpool
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "200"))
+FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "0.5"))  # seconds
+MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000"))
+# What to do when MAX_PENDING rows are already buffered:
+#   block       - wait for the flusher to make room
+#   drop_newest - discard the incoming row
+#   drop_oldest - discard the oldest buffered row
+#   sync        - write the incoming row immediately on the caller's thread
+OVERFLOW_POLICY = os.getenv("WRITE_BEHIND_OVERFLOW", "block")
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest", "sync")
+
+
+class WriteBehindQueue:
+    def __init__(self, session_factory=SessionLocal, max_batch: int = MAX_BATCH,
+                 flush_interval: float = FLUSH_INTERVAL, max_pending: int = MAX_PENDING,
+                 overflow_policy: str = OVERFLOW_POLICY):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow_policy must be one of {OVERFLOW_POLICIES}")
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.overflow_policy = overflow_policy
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self._pending = deque()
+        self._in_flight = []  # popped by the flusher, not yet committed
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def enqueue(self, model, row: dict):
+        """Buffer one row for `model`; it is inserted on the next flush."""
+        with self._cond:
+            if not self._stopping:
+                if self._thread is None:
+                    self._start()
+                if self._make_room():
+                    self._pending.append((model, row))
+                    if len(self._pending) >= self.max_batch:
+                        self._cond.notify_all()
+                    return
+                if self.overflow_policy == "drop_newest":
+                    self.dropped += 1
+                    return
+        # "sync" overflow, or the queue has been stopped: write on the caller's thread
+        self._write([(model, row)])
+
+    def try_enqueue(self, model, row: dict) -> bool:
+        """Like enqueue, but never waits or writes; False when enqueue would have to."""
+        with self._cond:
+            if self._stopping:
+                return False
+            if self._thread is None:
+                self._start()
+            if len(self._pending) >= self.max_pending:
+                if self.overflow_policy == "drop_newest":
+                    self.dropped += 1
+                    return True
+                if self.overflow_policy != "drop_oldest":
+                    return False  # "block" would wait, "sync" would write
+                self._make_room()
+            self._pending.append((model, row))
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+            return True
+
+    async def enqueue_async(self, model, row: dict):
+        """enqueue for coroutines: waiting on a full queue, or a sync write, happens in the threadpool."""
+        if not self.try_enqueue(model, row):
+            await run_in_threadpool(self.enqueue, model, row)
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy; True once the buffer can take another row."""
+        if len(self._pending) < self.max_pending:
+            return True
+        if self.overflow_policy == "drop_oldest":
+            self._pending.popleft()
+            self.dropped += 1
+            return True
+        if self.overflow_policy == "block":
+            self._cond.notify_all()
+            while len(self._pending) >= self.max_pending and not self._stopping:
+                self._cond.wait()
+            return not self._stopping
+        return False
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the flusher after draining everything still buffered."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def pending_rows(self, model) -> list:
+        """Rows for `model` that are buffered or being flushed, i.e. not yet readable from the database."""
+        with self._cond:
+            return [row for m, row in list(self._in_flight) + list(self._pending) if m is model]
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "flushed": self.flushed,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "overflow_policy": self.overflow_policy,
+            }
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.max_batch and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+                self._in_flight = batch
+                done = self._stopping and not self._pending
+                self._cond.notify_all()  # wake producers blocked on a full buffer
+            if batch:
+                self._write(batch)
+                with self._cond:
+                    self._in_flight = []
+            if done:
+                return
+
+    def _write(self, batch):
+        db = self.session_factory()
+        try:
+            # One bulk insert per model, preserving arrival order within each
+            rows_by_model = {}
+            for model, row in batch:
+                rows_by_model.setdefault(model, []).append(row)
+            for model, rows in rows_by_model.items():
+                db.execute(insert(model), rows)
+            db.commit()
+            with self._cond:
+                self.flushed += len(batch)
+        except Exception:
+            db.rollback()
+            logger.exception("write-behind flush of %d rows failed", len(batch))
+            with self._cond:
+                self.failed += len(batch)
+        finally:
+            db.close()
+
+
+write_queue = WriteBehindQueue()
@@ -68,6 +68,11 @@ function logout() {
 }
 
 // ─── API Wrapper ───
+// Resolve server-relative asset paths (e.g. /api/assets/...) against the API host
+function assetUrl(path) {
+    return new URL(path, API_BASE).href;
+}
+
 async function api(endpoint, options = {}) {
     const url = `${API_BASE}${endpoint}`;
     const headers = {
@@ -80,9 +85,11 @@ async function api(endpoint, options = {}) {
         headers['Authorization'] = `Bearer ${token}`;
     }
 
+    const { onEvent, ...fetchOptions } = options;
+
     try {
         const response = await fetch(url, {
-            ...options,
+            ...fetchOptions,
             headers,
         });
 
@@ -92,6 +99,12 @@ async function api(endpoint, options = {}) {
             return null;
         }
 
+        // Server-Sent Events: hand each event to onEvent as it arrives
+        const contentType = response.headers.get('Content-Type') || '';
+        if (response.ok && onEvent && contentType.startsWith('text/event-stream')) {
+            return await readEventStream(response, onEvent);
+        }
+
         // Get response text first to handle empty responses
         const text = await response.text();
 
@@ -116,6 +129,41 @@ async function api(endpoint, options = {}) {
     }
 }
 
+// Parses an SSE body, calling onEvent(data, eventName) per event; resolves with the 'done' payload
+// and rejects on an 'error' event (the server failed after the response started)
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result = null;
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const raw = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let eventName = 'message';
+            const dataLines = [];
+            raw.split('\n').forEach(line => {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+            });
+            if (!dataLines.length) continue;
+
+            const data = JSON.parse(dataLines.join('\n'));
+            if (eventName === 'error') throw new Error(data.detail || 'Stream failed');
+            if (eventName === 'done') result = data;
+            onEvent(data, eventName);
+        }
+    }
+    return result;
+}
+
 // ─── Toast Notifications ───
 function showToast(message, type = 'success') {
     const existing = document.querySelector('.toast');